@@ -5,7 +5,6 @@ All these functions can take custom arguments, but the first argument
 must be an Ihmacs object containing the global state of the editor.
 """
 
-import re
 from string import (
     ascii_letters,
     digits,
@@ -15,12 +14,25 @@ from random import randrange
 
 from tree_helpers import build_tree_from_pairs
 from markov import generate_sentence_from_text
+from motion import (
+    units_away,
+    unit_at,
+    words_away,
+    lines_away,
+)
+
+
+# How many characters before point word_at_point starts searching at.
+_THING_WINDOW = 4096
 
 
 def self_insert_command(ihmacs_state):
     """
     Insert the character you type at point.
 
+    When text is pasted, the controller collects the pasted characters into
+    the last stroke of the keychord, so they are all inserted at once.
+
     Args:
         ihmacs_state: The entire global Ihmacs state as an Ihmacs instance.
 
@@ -29,11 +41,11 @@ def self_insert_command(ihmacs_state):
         this is the empty string.
     """
     keychord = ihmacs_state.keychord
-    # The last stroke typed in the keychord
-    char = keychord[-1]
+    # The last stroke typed in the keychord, or a burst of pasted characters
+    chars = keychord[-1]
 
     # Side effects
-    return insert(ihmacs_state, char)
+    return insert(ihmacs_state, chars)
 
 
 def insert(ihmacs_state, string):
@@ -155,10 +167,10 @@ def next_buffer(ihmacs_state):
         ihmacs_state: The global state of the editor as an Ihmacs instance.
     """
     buffer_list = ihmacs_state.buffers
+    if not buffer_list:
+        return
     current_buff_index = ihmacs_state.active_buff_index
-    next_buff_index = current_buff_index + 1
-    if len(buffer_list) == next_buff_index:
-        next_buff_index = 0
+    next_buff_index = (current_buff_index + 1) % len(buffer_list)
 
     ihmacs_state.switch_buffer(next_buff_index)
 
@@ -173,10 +185,10 @@ def previous_buffer(ihmacs_state):
         ihmacs_state: The global state of the editor as an Ihmacs instance.
     """
     buffer_list = ihmacs_state.buffers
+    if not buffer_list:
+        return
     current_buff_index = ihmacs_state.active_buff_index
-    next_buff_index = current_buff_index - 1
-    if next_buff_index < 0:
-        next_buff_index = len(buffer_list) - 1
+    next_buff_index = (current_buff_index - 1) % len(buffer_list)
 
     ihmacs_state.switch_buffer(next_buff_index)
 
@@ -265,6 +277,22 @@ def backwards_delete_char(ihmacs_state, num=1):
     return delete_char(ihmacs_state, num=-num)
 
 
+def undo(ihmacs_state):
+    """
+    Undo the last edit to the active buffer.
+
+    Args:
+        ihmacs_state: The global state of the editor as an Ihmacs instance.
+    """
+    buff = ihmacs_state.active_buff()
+
+    # Side effects
+    if buff.read_only:
+        message(ihmacs_state, f"{buff.name} is read only.")
+    elif not buff.undo():
+        message(ihmacs_state, "No further undo information")
+
+
 def newline(ihmacs_state, num=1):
     """
     Insert N newlines at point.
@@ -313,8 +341,7 @@ def point_max(ihmacs_state):
         ihmacs_state: The global state of the editor as an Ihmacs instance.
     """
     buff = ihmacs_state.active_buff()
-    text = buff.text
-    return len(text)
+    return buff.size
 
 
 # This function exists for if I were to add narrowing in the future.
@@ -334,6 +361,8 @@ def point_forward_by_delimiter(ihmacs_state, delimiter_regex, num=1):
     """
     Return the point at the location forward N units separated by a delimiter.
 
+    If there are fewer than N units, return the end of the buffer.
+
     Args:
         ihmacs_state: The global state of the editor as an Ihmacs instance.
         delimiter_regex: A compiled regex that searches for instances of the
@@ -346,69 +375,29 @@ def point_forward_by_delimiter(ihmacs_state, delimiter_regex, num=1):
     """
     if num == 0:
         return 0
-    if num < 0:
-        return point_backward_by_delimiter(ihmacs_state,
-                                           delimiter_regex,
-                                           num=-num)
 
     buff = ihmacs_state.active_buff()
-    text = buff.text
-    point = buff.point
-
-    delimiters = delimiter_regex.finditer(text)
-    # Units end at the start of delimiters. Find all ends after point.
-    unit_ends = [i.start() for i in delimiters if i.start() > point]
-
-    try:
-        # Find the end of the nth next unit
-        new_point = unit_ends[num-1]
-        return new_point
-    except IndexError:
-        # If we are trying to go too far ahead, that means we are in the
-        # last unit already. Move to the end of it.
-        new_point = point_max(ihmacs_state)
-        return new_point
+    return units_away(buff.text, buff.point, delimiter_regex, num)
 
 
 def point_backward_by_delimiter(ihmacs_state, delimiter_regex, num=1):
     """
     Return the point at the location backward N units separated by a delimiter.
 
+    If there are fewer than N units, return the start of the buffer.
+
     Args:
-        Args:
         ihmacs_state: The global state of the editor as an Ihmacs instance.
         delimiter_regex: A compiled regex that searches for instances of the
             delimiter.
-        num: The number of units to search forward.
+        num: The number of units to search backward.
 
     Returns:
         An int representing the location of the point moved backward by N
         delimiter separated unit.
     """
-    if num == 0:
-        return 0
-    if num < 0:
-        return point_forward_by_delimiter(ihmacs_state,
-                                          delimiter_regex,
-                                          num=-num)
-
-    buff = ihmacs_state.active_buff()
-    text = buff.text
-    point = buff.point
-
-    delimiters = delimiter_regex.finditer(text)
-    # Units start at the end of delimiters. Find all starts before point.
-    unit_starts = [i.end() for i in delimiters if i.end() < point]
-
-    try:
-        # Find the start of the nth previous unit
-        new_point = unit_starts[-num]
-        return new_point
-    except IndexError:
-        # If we are trying to go too far back, that means go to the
-        # first unit, or just the start of the buffer.
-        new_point = point_min(ihmacs_state)
-        return new_point
+    return point_forward_by_delimiter(ihmacs_state, delimiter_regex,
+                                      num=-num)
 
 
 def forward_by_delimiter(ihmacs_state, delimiter_regex, num=1):
@@ -450,6 +439,25 @@ def backward_by_delimiter(ihmacs_state, delimiter_regex, num=1):
     buff.set_point(new_point)
 
 
+def point_forward_word(ihmacs_state, num=1):
+    """
+    Return the point at the end of the Nth word after point.
+
+    A word is defined as being delimited by the mode specific word delimiters.
+
+    Args:
+        ihmacs_state: The global state of the editor as an Ihmacs instance.
+        num: The number of words to search forward. If negative, return the
+            start of the Nth word before point instead.
+
+    Returns:
+        An int representing the location of the point moved by N words.
+    """
+    buff = ihmacs_state.active_buff()
+    return words_away(buff.substring, buff.size, buff.point,
+                      buff.major_mode.word_char_table, num)
+
+
 def forward_word(ihmacs_state, num=1):
     """
     Move point forward N words.
@@ -463,9 +471,7 @@ def forward_word(ihmacs_state, num=1):
         num: The number of words to move forward. If negative, move backwards.
     """
     buff = ihmacs_state.active_buff()
-    major_mode = buff.major_mode
-    delimiter_regex = major_mode.word_delimiters_regex
-    forward_by_delimiter(ihmacs_state, delimiter_regex, num=num)
+    buff.set_point(point_forward_word(ihmacs_state, num=num))
 
 
 def backward_word(ihmacs_state, num=1):
@@ -480,7 +486,8 @@ def backward_word(ihmacs_state, num=1):
         ihmacs_state: The global state of the editor as an Ihmacs instance.
         num: The number of words to move backward. If negative, move forwards.
     """
-    forward_word(ihmacs_state, num=-num)
+    buff = ihmacs_state.active_buff()
+    buff.set_point(point_forward_word(ihmacs_state, num=-num))
 
 
 def beginning_of_buffer(ihmacs_state):
@@ -511,27 +518,15 @@ def end_of_buffer(ihmacs_state):
 
 def move_end_of_line(ihmacs_state):
     """
-    Move point to start of the current line.
+    Move point to end of the current line.
 
     Args:
         ihmacs_state: The global state of the editor as an Ihmacs instance.
     """
-    # Test if we are already at the end of a line
     buff = ihmacs_state.active_buff()
-    text = buff.text
-    point = buff.point
-    try:
-        current_char = text[point]
-    except IndexError:
-        # End of File
-        current_char = "\n"
-    if current_char == "\n":
-        # We are already at the end of a line.
-        return
+    _, line_end = buff.line_span(buff.line)
 
-    newline_string = "\n+"
-    newline_regex = re.compile(newline_string)
-    forward_by_delimiter(ihmacs_state, newline_regex)
+    buff.set_point(line_end)
 
 
 def move_beginning_of_line(ihmacs_state):
@@ -541,15 +536,10 @@ def move_beginning_of_line(ihmacs_state):
     Args:
         ihmacs_state: The global state of the editor as an Ihmacs instance.
     """
-    # Test if we are already at the start of a line
     buff = ihmacs_state.active_buff()
-    column = buff.column
-    if column == 0:
-        return
+    line_start, _ = buff.line_span(buff.line)
 
-    newline_string = "\n+"
-    newline_regex = re.compile(newline_string)
-    backward_by_delimiter(ihmacs_state, newline_regex)
+    buff.set_point(line_start)
 
 
 def previous_line(ihmacs_state, num=1):
@@ -576,14 +566,17 @@ def previous_line(ihmacs_state, num=1):
     buff = ihmacs_state.active_buff()
     original_column = buff.column
 
-    for _ in range(num):
-        move_beginning_of_line(ihmacs_state)
-        backward_char(ihmacs_state)
+    # Look the line up in the buffer's newline index.
+    target_line = buff.line - num
+    if target_line < 1:
+        # Ran out of lines, go to the start of the first line.
+        beginning_of_buffer(ihmacs_state)
+        return
 
     # Adjust column
-    new_column = buff.column
-    adjust_chars = max(0, new_column-original_column)
-    backward_char(ihmacs_state, adjust_chars)
+    line_start, line_end = buff.line_span(target_line)
+    line_len = line_end - line_start
+    buff.set_point(line_start + min(original_column, line_len))
 
 
 def next_line(ihmacs_state, num=1):
@@ -609,15 +602,17 @@ def next_line(ihmacs_state, num=1):
     buff = ihmacs_state.active_buff()
     original_column = buff.column
 
-    for _ in range(num):
-        move_end_of_line(ihmacs_state)
-        forward_char(ihmacs_state)
+    # Look the line up in the buffer's newline index.
+    target_line = buff.line + num
+    if target_line > buff.line_count:
+        # Ran out of lines, go to the end of the last line.
+        end_of_buffer(ihmacs_state)
+        return
 
     # Adjust column
-    current_line = line_at_point(ihmacs_state)
-    current_line_len = len(current_line)
-    adjust_chars = min(original_column, current_line_len)
-    forward_char(ihmacs_state, adjust_chars)
+    line_start, line_end = buff.line_span(target_line)
+    line_len = line_end - line_start
+    buff.set_point(line_start + min(original_column, line_len))
 
 
 def scroll_up(ihmacs_state, num=1):
@@ -669,7 +664,7 @@ def scroll_down(ihmacs_state, num=1):
 # This does not do what the actual thing-at-point function does in GNU/Emacs,
 # although it could be used as a helper function do so (or maybe
 # not). Regardless, that doesn't matter.
-def thing_at_point_regex(ihmacs_state, thing_regex):
+def thing_at_point_regex(ihmacs_state, thing_regex, window=None):
     """
     Return the thing the point is located in that is defined by a regex.
 
@@ -680,6 +675,9 @@ def thing_at_point_regex(ihmacs_state, thing_regex):
     Args:
         ihmacs_state: The global state of the editor as an Ihmacs instance.
         thing_regex: A compiled regex defining the unit delimiters.
+        window: An int representing how many characters before point to start
+            searching at, or None to search from the start of the buffer. See
+            unit_at for which regexes this is safe for.
 
     Returns:
         A string representing the thing at point. If point is not at a unit,
@@ -687,15 +685,12 @@ def thing_at_point_regex(ihmacs_state, thing_regex):
     """
     buff = ihmacs_state.active_buff()
     text = buff.text
-    point = buff.point
 
-    units = thing_regex.finditer(text)
-    for unit in units:
-        start, end = unit.span()
-        if start <= point <= end:
-            return text[start:end]
-    # Point is not at a unit
-    return ""
+    span = unit_at(text, buff.point, thing_regex, window=window)
+    if span is None:
+        # Point is not at a unit
+        return ""
+    return text[span[0]:span[1]]
 
 
 def line_at_point(ihmacs_state):
@@ -708,10 +703,10 @@ def line_at_point(ihmacs_state):
     Returns:
         A string representing the contents of the current line.
     """
-    line_regex_string = "^.*$"
-    line_regex = re.compile(line_regex_string,
-                            re.MULTILINE)
-    return thing_at_point_regex(ihmacs_state, line_regex)
+    buff = ihmacs_state.active_buff()
+    line_start, line_end = buff.line_span(buff.line)
+
+    return buff.substring(line_start, line_end)
 
 
 def word_at_point(ihmacs_state):
@@ -728,7 +723,10 @@ def word_at_point(ihmacs_state):
     major_mode = buff.major_mode
     word_regex = major_mode.word_regex
 
-    return thing_at_point_regex(ihmacs_state, word_regex)
+    # Words are runs of non delimiters, so searching from a window before
+    # point finds the same word as searching the whole buffer.
+    return thing_at_point_regex(ihmacs_state, word_regex,
+                                window=_THING_WINDOW)
 
 
 def kill_append(ihmacs_state, text):
@@ -797,15 +795,28 @@ def kill_ring_save(ihmacs_state):
         ihmacs_state: The global state of the editor as an Ihmacs instance.
     """
     buff = ihmacs_state.active_buff()
-    text = buff.text
     points = (buff.point, buff.mark)
     start = min(points)
     end = max(points)
 
-    kill_text = text[start:end]
+    kill_text = buff.substring(start, end)
     kill_append(ihmacs_state, kill_text)
 
 
+def _kill_to(ihmacs_state, kill_point):
+    """
+    Kill the text between point and a position.
+
+    Args:
+        ihmacs_state: The global state of the editor as an Ihmacs instance.
+        kill_point: An int representing the other end of the killed text.
+    """
+    buff = ihmacs_state.active_buff()
+    chars_to_delete = kill_point - buff.point
+    killed_text = delete_char(ihmacs_state, num=chars_to_delete)
+    kill_append(ihmacs_state, killed_text)
+
+
 def kill_forward_by_delimiter(ihmacs_state, delimiter_regex, num=1):
     """
     Kill forwards N units of text separated by a delimiter.
@@ -818,16 +829,10 @@ def kill_forward_by_delimiter(ihmacs_state, delimiter_regex, num=1):
             delimiter.
         num: The number of units to kill
     """
-    buff = ihmacs_state.active_buff()
-    point = buff.point
-
     kill_point = point_forward_by_delimiter(ihmacs_state,
                                             delimiter_regex,
                                             num=num)
-    # Side effects
-    chars_to_delete = kill_point - point
-    killed_text = delete_char(ihmacs_state, num=chars_to_delete)
-    kill_append(ihmacs_state, killed_text)
+    _kill_to(ihmacs_state, kill_point)
 
 
 def kill_backward_by_delimiter(ihmacs_state, delimiter_regex, num=1):
@@ -849,15 +854,19 @@ def kill_line(ihmacs_state, num=1):
     """
     Kill the rest of the current line after point.
 
+    Blank lines are killed along with the line before them.
+
     Adds killed text to kill_ring.
 
     Args:
         ihmacs_state: The global state of the editor as an Ihmacs instance.
-        num: An integer representing the number of lines to kill.
+        num: An integer representing the number of lines to kill. If
+            negative, kill backwards.
     """
-    newline_string = "\n+"
-    newline_regex = re.compile(newline_string)
-    kill_forward_by_delimiter(ihmacs_state, newline_regex, num=num)
+    buff = ihmacs_state.active_buff()
+    kill_point = lines_away(buff.line_span, buff.line_count, buff.line,
+                            buff.point, num)
+    _kill_to(ihmacs_state, kill_point)
 
 
 def backward_kill_line(ihmacs_state, num=1):
@@ -889,10 +898,7 @@ def forward_kill_word(ihmacs_state, num=1):
         ihmacs_state: The global state of the editor as an Ihmacs instance.
         num: An integer representing the number of words to kill.
     """
-    buff = ihmacs_state.active_buff()
-    major_mode = buff.major_mode
-    delimiter_regex = major_mode.word_delimiters_regex
-    kill_forward_by_delimiter(ihmacs_state, delimiter_regex, num=num)
+    _kill_to(ihmacs_state, point_forward_word(ihmacs_state, num=num))
 
 
 def backward_kill_word(ihmacs_state, num=1):
@@ -932,10 +938,13 @@ def generate_sentence_from_buffer(ihmacs_state, num=1):
     insert(ihmacs_state, text_to_insert)
 
 
+# Printable keys that insert themselves in the default global keymap.
+SELF_INSERT_KEYS = frozenset(ascii_letters+digits+punctuation+" ")
+
 # The default global keymap.
 DEFAULT_GLOBAL_KEYMAP = build_tree_from_pairs(
     [[[i], self_insert_command]
-     for i in ascii_letters+digits+punctuation+" "] +
+     for i in sorted(SELF_INSERT_KEYS)] +
     [[["C-j"], newline],  # Enter, C-j, and C-m... thanks curses keypad
      [["DEL"], backwards_delete_char],  # Backspace
      [["KEY_DC"], delete_char],  # Delete
@@ -968,6 +977,7 @@ DEFAULT_GLOBAL_KEYMAP = build_tree_from_pairs(
      [["M-d"], forward_kill_word],
      [["M-<"], beginning_of_buffer],
      [["M->"], end_of_buffer],
+     [["C-_"], undo],  # C-/ sends the same key code as C-_
      # For fun
      [["C-c", "C-j"], generate_sentence_from_buffer],
      # Extended commands
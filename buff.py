@@ -2,17 +2,29 @@
 Ihmacs buffer implementation.
 """
 
+from collections import deque
+
 from fundamental_mode import FundamentalMode
+from rope import Rope
+from line_index import LineIndex
 from tree_helpers import merge_trees
 
 
+# The most undo steps a buffer remembers.
+UNDO_LIMIT = 1000
+
+# The most consecutive edits of the same kind grouped into one undo step, so
+# undoing after typing a paragraph does not remove the whole paragraph.
+UNDO_GROUP_MAX = 20
+
+
 # pylint: disable=R0902, disable=R0904
 class Buffer:
     """
     Ihmacs text buffer.
 
     Attributes:
-        _text: A string representing the buffer text.
+        _text: A Rope representing the buffer text.
         _modified: A bool representing if the buffer has been modified since
             last save.
         _point: An int representing cursor position in file.
@@ -27,6 +39,23 @@ class Buffer:
             displayed as the first line of a window in the view. Line number
             indexes at 1, as in, the first line is 1 not 0.
         _read_only: A bool representing if the buffer is read only or not.
+        _text_cache: A string holding the flattened text of the buffer, or
+            None if the text has been edited since it was last flattened.
+        _newlines: A LineIndex of the position of every newline in the
+            buffer, or None if it has not been built yet. Built on first use
+            and then kept up to date by the editing methods.
+        _line_cache: A tuple of three ints, a position of point, the line it
+            is on, and the position of the start of that line, or None. Only
+            valid while point is still at that position and the text has not
+            changed since.
+        _undo_history: A deque (as a stack) of tuples holding a snapshot of the
+            text Rope, point, and mark from before each undo step. Snapshots
+            share the tree of the text, so each only costs the nodes the edit
+            touched.
+        _undo_group: A tuple of a string representing the kind of edit, an int
+            representing where point has to be for the next edit to join the
+            undo step, and an int representing how many edits the step holds.
+            None if the next edit starts a new undo step.
     """
 
     def __init__(self, name="**", path="", keymap=None,
@@ -42,13 +71,18 @@ class Buffer:
             read_only: A bool representing whether or not to make the new
                 buffer read only.
         """
-        self._text = ""
+        self._text = Rope()
         self._modified = False
         self._point = 0
         self._mark = 0
         self._name = name
         self._path = path
         self._read_only = read_only
+        self._text_cache = None
+        self._newlines = None
+        self._line_cache = None
+        self._undo_history = deque(maxlen=UNDO_LIMIT)
+        self._undo_group = None
 
         self.major_mode = FundamentalMode()
 
@@ -77,8 +111,20 @@ class Buffer:
     def text(self):
         """
         Return text in buffer.
+
+        Flattening the rope is O(N), so the result is cached until the next
+        edit.
+        """
+        if self._text_cache is None:
+            self._text_cache = str(self._text)
+        return self._text_cache
+
+    @property
+    def size(self):
+        """
+        Return the number of characters in the buffer.
         """
-        return self._text
+        return len(self._text)
 
     @property
     def modified(self):
@@ -127,35 +173,22 @@ class Buffer:
         """
         Return the line in the buffer the point is located at.
         """
-        point = self.point
-        text_before_point = self.text[:point]
-        # Because of the bloody convention that the first line of text is 1 not
-        # 0 add 1
-        return 1 + text_before_point.count("\n")
+        return self._point_line()[0]
 
     @property
     def column(self):
         """
         Return the column in the buffer the point is located at.
         """
-        point = self.point
-        text = self.text
-        # Count how many characters it takes to find a newline char before
-        # point
-        col = 0
-        while point - col > 0:
-            if text[point-col-1] == "\n":  # Hard coding Unix newline...
-                return col
-            col += 1
-        return col
+        line_start = self._point_line()[1]
+        return self.point - line_start
 
     @property
     def line_count(self):
         """
         Return the number of lines in the buffer.
         """
-        text = self.text
-        return text.count("\n") + 1
+        return len(self._newline_index()) + 1
 
     @property
     def modeline(self):
@@ -194,6 +227,111 @@ class Buffer:
 
     # Helper methods
 
+    def _point_line(self):
+        """
+        Return the line point is on and where that line starts.
+
+        The result is cached, so asking for both the line and column, or
+        asking again before point moves, only searches the index once.
+
+        Returns:
+            A tuple of two ints, the line point is on and the position of the
+            start of that line.
+        """
+        point = self.point
+        line_cache = self._line_cache
+        if line_cache is None or line_cache[0] != point:
+            newlines = self._newline_index()
+            newlines_before_point = newlines.count_before(point)
+            line_start = 0
+            if newlines_before_point > 0:
+                line_start = newlines.newline(newlines_before_point-1) + 1
+            # Because of the bloody convention that the first line of text is
+            # 1 not 0 add 1
+            line_cache = (point, 1 + newlines_before_point, line_start)
+            self._line_cache = line_cache
+        return line_cache[1:]
+
+    def _newline_index(self):
+        """
+        Return the index of newline positions, building it if needed.
+        """
+        if self._newlines is None:
+            self._newlines = LineIndex(self.text)
+        return self._newlines
+
+    def _index_insert(self, pos, text):
+        """
+        Update the newline index for text inserted at a position.
+
+        Args:
+            pos: An int representing where the text was inserted.
+            text: The inserted string.
+        """
+        self._line_cache = None
+        if self._newlines is not None:
+            self._newlines.insert(pos, text)
+
+    def _index_delete(self, start, end):
+        """
+        Update the newline index for text deleted between two positions.
+
+        Args:
+            start: An int representing the start of the deleted text.
+            end: An int representing the end of the deleted text.
+        """
+        self._line_cache = None
+        if self._newlines is not None:
+            self._newlines.delete(start, end)
+
+    def substring(self, start, end):
+        """
+        Return the text between two positions.
+
+        Reads only the requested text from the rope rather than flattening
+        the whole buffer, unless the flattened text is already cached.
+
+        Args:
+            start: An int representing the start of the text.
+            end: An int representing the end of the text.
+
+        Returns:
+            A string containing the text between start and end.
+        """
+        start = self._normalize_pos(start)
+        end = self._normalize_pos(end)
+        if self._text_cache is not None:
+            return self._text_cache[start:end]
+        return self._text.substring(start, end)
+
+    def line_span(self, line):
+        """
+        Return the positions of the start and end of a line.
+
+        Args:
+            line: An int representing a line number. Line numbers index at 1.
+                Clamped to the lines in the buffer.
+
+        Returns:
+            A tuple of two ints. The first is the position of the first
+            character in the line. The second is the position of the newline
+            ending the line, or the end of the buffer for the last line.
+        """
+        newlines = self._newline_index()
+        line = max(1, min(line, len(newlines) + 1))
+
+        if line == 1:
+            start = 0
+        else:
+            start = newlines.newline(line-2) + 1
+
+        if line > len(newlines):
+            end = self.size
+        else:
+            end = newlines.newline(line-1)
+
+        return (start, end)
+
     def _normalize_pos(self, pos):
         """
         Normalize a point to ensure it lies in the range of the buffer.
@@ -206,7 +344,7 @@ class Buffer:
         Returns:
             An int between 0 and the length of the text in the buffer.
         """
-        return max(0, min(pos, len(self.text)))
+        return max(0, min(pos, self.size))
 
     # Disk operations
     def revert(self):
@@ -222,7 +360,12 @@ class Buffer:
         """
         path = self.path
         with open(path, "r") as disk_file:
-            self._text = disk_file.read()
+            self._text = Rope(disk_file.read())
+        self._text_cache = None
+        self._newlines = None
+        self._line_cache = None
+        self._undo_history.clear()
+        self._undo_group = None
 
         self._point = 0
         self._mark = 0
@@ -293,6 +436,61 @@ class Buffer:
 
         self._display_line = max(1, min(total_lines, current_line + lines))
 
+    # Undo
+
+    def _push_undo(self, kind, next_point):
+        """
+        Remember the text, point, and mark from before an edit.
+
+        A run of edits of the same kind, each starting where the last one left
+        point, such as typing or backspacing, is grouped into one undo step.
+        Only the first edit of a step takes a snapshot.
+
+        Args:
+            kind: A string representing the kind of edit, or None if the edit
+                is never grouped with others.
+            next_point: An int representing where point is after the edit.
+        """
+        group = self._undo_group
+        if (kind is not None and group is not None and group[0] == kind
+                and group[1] == self._point and group[2] < UNDO_GROUP_MAX):
+            self._undo_group = (kind, next_point, group[2] + 1)
+            return
+
+        self._undo_history.append((self._text.snapshot(), self._point,
+                                   self._mark))
+        self._undo_group = None
+        if kind is not None:
+            self._undo_group = (kind, next_point, 1)
+
+    def undo(self):
+        """
+        Undo the last undo step of the buffer.
+
+        Restores the text, point, and mark from before the step. Sets modified
+        state to True.
+
+        Returns:
+            A bool representing whether or not there was an edit to undo.
+            False if buffer is read only.
+        """
+        if self.read_only or not self._undo_history:
+            return False
+
+        text, point, mark = self._undo_history.pop()
+
+        # Side effects
+        self._text = text
+        self._text_cache = None
+        self._newlines = None
+        self._line_cache = None
+        self._undo_group = None
+        self._point = point
+        self._mark = mark
+
+        self._modified = True
+        return True
+
     # Base editing operations. These all return values because that will
     # be useful for say, pushing to the kill ring.
 
@@ -319,11 +517,26 @@ class Buffer:
 
         insert_text = "".join(args)
         insert_len = len(insert_text)
+        line_cache = self._line_cache
 
         # The side effects
-        self._text = self.text[:point] + insert_text + self.text[point:]
+        if insert_text:
+            self._push_undo("insert", point + insert_len)
+        self._text.insert(point, insert_text)
+        self._text_cache = None
+        self._index_insert(point, insert_text)
         self._point = point + insert_len
 
+        # Point moves along with the inserted text, so its new line and column
+        # follow from the inserted text alone.
+        if line_cache is not None and line_cache[0] == point:
+            _, line, line_start = line_cache
+            newline_count = insert_text.count("\n")
+            if newline_count:
+                line += newline_count
+                line_start = point + insert_text.rfind("\n") + 1
+            self._line_cache = (point + insert_len, line, line_start)
+
         if mark > point:
             self._mark = mark + insert_len
 
@@ -358,11 +571,18 @@ class Buffer:
         end = max(points)
 
         # Info about what we are deleting
-        deleted_text = self.text[start:end]
+        deleted_text = self.substring(start, end)
         deleted_len = len(deleted_text)
 
         # The side effects
-        self._text = self.text[:start] + self.text[end:]
+        if start < end:
+            if chars < 0:
+                self._push_undo("delete_backward", start)
+            else:
+                self._push_undo("delete_forward", start)
+        self._text.delete(start, end)
+        self._text_cache = None
+        self._index_delete(start, end)
 
         # If deleting text before point, move point backwards
         if chars < 0:
@@ -399,10 +619,14 @@ class Buffer:
         start = min(self.point, self.mark)
         end = max(self.point, self.mark)
 
-        deleted_text = self.text[start:end]
+        deleted_text = self.substring(start, end)
 
         # Side effects
-        self._text = self.text[:start] + self.text[end:]
+        if start < end:
+            self._push_undo(None, start)
+        self._text.delete(start, end)
+        self._text_cache = None
+        self._index_delete(start, end)
         self._point = start
         self._mark = start
 
@@ -425,5 +649,8 @@ class Buffer:
             buffer is read only.
         """
         self._modified = True
-        self._text = self._text + text
+        self._undo_group = None
+        self._index_insert(len(self._text), text)
+        self._text.insert(len(self._text), text)
+        self._text_cache = None
         return text
@@ -7,6 +7,59 @@ Has facilities for reading keychords and executing the associated command.
 import curses
 
 
+def _build_key_table():
+    """
+    Build a table converting key codes below 256 into keystroke names.
+
+    Returns:
+        A list of 256 tuples. Each tuple holds two strings, the control
+        modifier ("C-" or "") and the name of the key.
+    """
+    table = []
+    for code in range(256):
+        if code == 0:  # Apparently C-SPACE returns this
+            table.append(("C-", " "))
+        elif code == 27:  # ESC, the king of causing problems
+            table.append(("", "ESC"))
+        elif code < 32:
+            # C-letter is reported as being from 1-26, and 28-31. curses
+            # prints these as ^ followed by the character 64 places up.
+            # 28-31 are various controls with glitchy effects.
+            table.append(("C-", chr(code + 64).lower()))
+        elif code == 127:  # DEL (backspace)
+            table.append(("", "DEL"))
+        else:
+            # Standard ASCII, and extended ASCII. Maybe your kbd has this?
+            table.append(("", chr(code)))
+    return table
+
+
+def _build_keypad_names():
+    """
+    Build a table converting keypad key codes into keystroke names.
+
+    curses.keyname only works once curses has been initialized, so unlike
+    _KEY_TABLE this cannot be built when the module is imported.
+
+    Returns:
+        A dictionary mapping every curses.KEY_* int to a string representing
+        the name of the key, such as "KEY_LEFT".
+    """
+    names = {}
+    for attr in dir(curses):
+        if attr.startswith("KEY_"):
+            code = getattr(curses, attr)
+            names[code] = curses.keyname(code).decode("utf-8")
+    # Handle how different terminals handle this
+    names[curses.KEY_BACKSPACE] = "DEL"
+    return names
+
+
+# Keystroke names for every key code below 256, built once so decoding a
+# keystroke is a single lookup.
+_KEY_TABLE = _build_key_table()
+
+
 class Controller:
     """
     Ihmacs class for handling input and executing actions.
@@ -16,6 +69,9 @@ class Controller:
         buff: The active buffer.
         keychord: The global keychord.
         ihmacs_state: The global state of the editor
+        _keypad_names: A dictionary mapping keypad key codes to keystroke
+            names. Starts with every curses.KEY_* code, and other keypad codes
+            are added the first time they are read.
     """
 
     def __init__(self, ihmacs_state):
@@ -33,7 +89,8 @@ class Controller:
         # The entire global state, used less frequently
         self.ihmacs_state = ihmacs_state
 
-    # pylint: disable=R0912
+        self._keypad_names = _build_keypad_names()
+
     def read_key(self):
         """
         Read keystroke from the user.
@@ -86,40 +143,78 @@ class Controller:
             facekey = key[0]
 
         # Handle key characters.
-
-        # C-letter is reported as being from 1-26, and 28-31. 27 is ESC.
-        control = ""
-
-        if facekey == 0:  # Apparently C-SPACE returns this
-            facekey = " "
-            control = "C-"
-        elif 1 <= facekey <= 26:
-            control = "C-"
-            facekey = chr(curses.unctrl(facekey)[1]).lower()  # Extract letter
-        elif facekey == 27:  # ESC, the king of causing problems
-            facekey = "ESC"
-        elif 28 <= facekey <= 31:  # Various controls with glitchy effects
-            control = "C-"
-            facekey = chr(curses.unctrl(facekey)[1]).lower()
-        elif 32 <= facekey <= 126:  # Alphanumeric keys, standard ASCII
-            facekey = chr(facekey)
-        elif facekey == 127:  # DEL (backspace)
-            facekey = "DEL"
-        elif 128 <= facekey <= 255:  # Extended ASCII. Maybe your kbd has this?
-            facekey = chr(facekey)
+        if 0 <= facekey <= 255:
+            control, facekey = _KEY_TABLE[facekey]
         elif facekey >= curses.KEY_MIN:  # keypad keys.
-            facekey = curses.keyname(facekey).decode("utf-8")
-            # Handle how different terminals handle this
-            if facekey == "KEY_BACKSPACE":
-                facekey = "DEL"
+            control = ""
+            facekey = self._keypad_name(facekey)
         else:
             # Congratulations, you broke it! Let's just make it escape
             # because chances are it's related to that.
+            control = ""
             facekey = "ESC"
 
         # Side Effects
         keychord.append(control+meta+facekey)
 
+    def _keypad_name(self, code):
+        """
+        Return the keystroke name of a keypad key.
+
+        Extended keys, such as control or alt with an arrow key, have no
+        curses.KEY_* constant, so their names are looked up and saved the first
+        time they are read.
+
+        Args:
+            code: An int representing a keypad key code.
+
+        Returns:
+            A string representing the name of the key, such as "KEY_LEFT".
+        """
+        name = self._keypad_names.get(code)
+        if name is None:
+            name = curses.keyname(code).decode("utf-8")
+            self._keypad_names[code] = name
+        return name
+
+    def read_burst(self, self_insert_keys):
+        """
+        Read the rest of a burst of self inserting keystrokes.
+
+        Pasting text into the terminal sends every character as a keystroke at
+        once. Rather than running self_insert_command once per character, read
+        every pending key that maps to self_insert_command and add it to the
+        last stroke of the global keychord, so the whole burst is inserted in
+        one go.
+
+        Stops at the first pending key that does not self insert, and pushes it
+        back to be read as the next keystroke.
+
+        Args:
+            self_insert_keys: A set of strings representing the keys that map
+                to self_insert_command in the keymap the keychord was read
+                with.
+        """
+        window = self.window
+        keychord = self.keychord
+
+        burst = [keychord[-1]]
+
+        # Only read keys that are already waiting.
+        window.nodelay(True)
+        char = window.getch()
+        while 0 <= char <= 255 and chr(char) in self_insert_keys:
+            burst.append(chr(char))
+            char = window.getch()
+        window.nodelay(False)
+
+        # getch returns -1 when no key is waiting.
+        if char != -1:
+            curses.ungetch(char)
+
+        # Side Effects
+        keychord[-1] = "".join(burst)
+
     def run_edit(self, func):
         """
         Run an editing function on the active buffer.
@@ -140,7 +235,9 @@ class Controller:
         Modify the echo string in the global Ihmacs instance.
 
         Args:
-            string: A string to set the echo string to.
+            string: A string to set the echo string to, or a function that
+                returns one. A function is only called when the echo area is
+                drawn, so the string is not built if it is never shown.
         """
         ihmacs_state = self.ihmacs_state
         ihmacs_state.echo = string
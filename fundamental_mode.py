@@ -5,7 +5,47 @@ All major modes inherit from FundamentalMode class.
 """
 
 
-import re
+from regex_engine import compile_regex
+
+
+# Whitespace characters above 255, the only ones \s matches outside of
+# Latin-1.
+_UNICODE_WHITESPACE = (
+    "\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009"
+    "\u200a\u2028\u2029\u202f\u205f\u3000"
+)
+
+# Word char tables already built, keyed by the tuple of word delimiters. Every
+# buffer gets its own mode instance, so modes with the same delimiters share a
+# table.
+_WORD_CHAR_TABLES = {}
+
+
+def _build_word_char_table(delimiters):
+    """
+    Build a translate table that maps every word delimiter to "\\0".
+
+    Only Latin-1, unicode whitespace, and characters written literally in the
+    delimiters are checked against the delimiter regex, rather than every
+    unicode character.
+
+    Args:
+        delimiters: A list of regular expressions representing the word
+            delimiters.
+
+    Returns:
+        A dictionary for str.translate. Any "\\0" already in the text is mapped
+        to "\\1", unless it is itself a delimiter, so it is not mistaken for
+        one.
+    """
+    delimiter_regex = compile_regex("[" + "".join(delimiters) + "]")
+    candidates = (set(map(chr, range(256))) | set(_UNICODE_WHITESPACE)
+                  | set("".join(delimiters)))
+    table = {0: "\1"}
+    for char in candidates:
+        if delimiter_regex.match(char):
+            table[ord(char)] = "\0"
+    return table
 
 
 class FundamentalMode:
@@ -21,6 +61,11 @@ class FundamentalMode:
         _word_delimiters: A list of regular expressions used to represent what
             the word delimiters are for the given mode. This is a list because
             it's easier to expand or delete for other modes.
+        _word_char_table: A dictionary for str.translate that maps every word
+            delimiter to "\\0", used to find word boundaries without a regex.
+        _word_delimiters_regex: A compiled regex that finds runs of word
+            delimiters.
+        _word_regex: A compiled regex that finds words.
     """
 
     _name = "Fundamental"
@@ -28,6 +73,21 @@ class FundamentalMode:
     # Words are separated by whitespace, dashes, and underscores
     _word_delimiters = [r"\s", r"\-", r"_"]
 
+    def __init__(self):
+        """
+        Initialize mode, compiling the word regexes and building the word char
+        table for its delimiters.
+        """
+        delimiters = tuple(self._word_delimiters)
+        self._word_delimiters_regex = compile_regex(
+            "[" + "".join(delimiters) + "]+")
+        self._word_regex = compile_regex("[^" + "".join(delimiters) + "]+")
+
+        if delimiters not in _WORD_CHAR_TABLES:
+            _WORD_CHAR_TABLES[delimiters] = \
+                _build_word_char_table(delimiters)
+        self._word_char_table = _WORD_CHAR_TABLES[delimiters]
+
     # Properties
     @property
     def name(self):
@@ -50,20 +110,23 @@ class FundamentalMode:
         """
         return self._word_delimiters
 
+    @property
+    def word_char_table(self):
+        """
+        Return the translate table that maps word delimiters to "\\0".
+        """
+        return self._word_char_table
+
     @property
     def word_delimiters_regex(self):
         """
         Return the regex that finds word delimiters.
         """
-        delimiters = self.word_delimiters
-        regex_str = "[" + "".join(delimiters) + "]+"
-        return re.compile(regex_str)
+        return self._word_delimiters_regex
 
     @property
     def word_regex(self):
         """
         Return the regex that finds words.
         """
-        delimiters = self.word_delimiters
-        regex_str = "[^" + "".join(delimiters) + "]+"
-        return re.compile(regex_str)
+        return self._word_regex
@@ -0,0 +1,229 @@
+"""
+Gap buffer implementation used for the leaf of a rope being edited.
+
+A gap buffer stores text as two halves with an empty gap between them. The gap
+sits at the location of the last edit, so a burst of inserts and deletes at the
+cursor only touches the ends of the two halves. Moving the gap costs time
+proportional to the distance moved.
+
+Both halves are bytearrays of UTF-8, so edits at the gap grow or shrink them in
+place instead of building new strings. Positions are still counted in
+characters. When a half is pure ASCII, characters and bytes line up one to one.
+Otherwise, character boundaries are found by skipping UTF-8 continuation bytes.
+"""
+
+
+def _is_continuation(byte):
+    """
+    Return whether a byte is a UTF-8 continuation byte (0b10xxxxxx).
+    """
+    return byte & 0xC0 == 0x80
+
+
+class GapBuffer:
+    """
+    Text sequence optimized for repeated edits at the same location.
+
+    Attributes:
+        _before: A bytearray of the UTF-8 text before the gap.
+        _after: A bytearray of the UTF-8 text after the gap, with the bytes in
+            reverse order so the text right after the gap is at the end.
+        _before_len: An int representing the number of characters before the
+            gap.
+        _after_len: An int representing the number of characters after the
+            gap.
+    """
+
+    def __init__(self, text="", gap=0):
+        """
+        Initialize gap buffer.
+
+        Args:
+            text: A string to initially fill the gap buffer with.
+            gap: An int representing where in the text to place the gap.
+        """
+        self._before = bytearray(text[:gap].encode("utf-8"))
+        self._after = bytearray(text[gap:].encode("utf-8")[::-1])
+        self._before_len = len(text[:gap])
+        self._after_len = len(text) - self._before_len
+
+    def __len__(self):
+        """
+        Return the number of characters in the gap buffer.
+        """
+        return self._before_len + self._after_len
+
+    def __str__(self):
+        """
+        Return the text in the gap buffer as a single string.
+        """
+        return self._before.decode("utf-8") + self._after_text()
+
+    @property
+    def gap(self):
+        """
+        Return the position of the gap.
+        """
+        return self._before_len
+
+    # Helper methods
+
+    def _after_text(self):
+        """
+        Return the text after the gap as a string.
+        """
+        return self._after[::-1].decode("utf-8")
+
+    def _before_tail_bytes(self, chars):
+        """
+        Return how many bytes the last N characters before the gap take up.
+
+        Args:
+            chars: An int representing a number of characters.
+        """
+        before = self._before
+        if len(before) == self._before_len:
+            return chars
+
+        # Step back over each lead byte and the continuation bytes after it.
+        i = len(before)
+        for _ in range(chars):
+            i -= 1
+            while _is_continuation(before[i]):
+                i -= 1
+        return len(before) - i
+
+    def _after_head_bytes(self, chars):
+        """
+        Return how many bytes the first N characters after the gap take up.
+
+        Args:
+            chars: An int representing a number of characters.
+        """
+        after = self._after
+        if len(after) == self._after_len:
+            return chars
+
+        # The bytes are reversed, so each character is its lead byte followed
+        # by its continuation bytes when stepping back from the end.
+        i = len(after)
+        for _ in range(chars):
+            i -= 1
+            while i > 0 and _is_continuation(after[i-1]):
+                i -= 1
+        return len(after) - i
+
+    def move_gap(self, pos):
+        """
+        Move the gap to a position in the text.
+
+        Args:
+            pos: An int representing where to move the gap to. Must lie between
+                0 and the length of the gap buffer.
+        """
+        gap = self._before_len
+
+        if pos < gap:
+            split = len(self._before) - self._before_tail_bytes(gap - pos)
+            moved = self._before[split:]
+            del self._before[split:]
+            moved.reverse()
+            self._after += moved
+        elif pos > gap:
+            split = len(self._after) - self._after_head_bytes(pos - gap)
+            moved = self._after[split:]
+            del self._after[split:]
+            moved.reverse()
+            self._before += moved
+        else:
+            return
+
+        self._after_len += gap - pos
+        self._before_len = pos
+
+    # Reading
+
+    def substring(self, start, end):
+        """
+        Return the text between two positions without moving the gap.
+
+        Args:
+            start: An int representing the start of the text.
+            end: An int representing the end of the text.
+
+        Returns:
+            A string containing the text between start and end.
+        """
+        before = self._before
+        after = self._after
+        gap = self._before_len
+
+        text = ""
+        if start < gap:
+            if len(before) == gap:
+                text = before[start:min(end, gap)].decode("ascii")
+            else:
+                text = before.decode("utf-8")[start:min(end, gap)]
+        if end > gap:
+            after_start = max(0, start - gap)
+            after_end = end - gap
+            if len(after) == self._after_len:
+                # Positions after the gap are stored back to front.
+                text += after[len(after)-after_end:
+                              len(after)-after_start][::-1].decode("ascii")
+            else:
+                text += self._after_text()[after_start:after_end]
+        return text
+
+    def index(self, pos):
+        """
+        Return the character at a position without moving the gap.
+
+        Args:
+            pos: An int representing the position of the character.
+
+        Returns:
+            A string containing the character at pos.
+        """
+        return self.substring(pos, pos + 1)
+
+    # Editing
+
+    def insert(self, pos, text):
+        """
+        Insert text at a position, moving the gap there first.
+
+        Args:
+            pos: An int representing where to insert the text.
+            text: A string to insert.
+        """
+        self.move_gap(pos)
+        self._before += text.encode("utf-8")
+        self._before_len += len(text)
+
+    def delete(self, start, end):
+        """
+        Delete the text between two positions.
+
+        Moves the gap to whichever end of the range is closest, and then grows
+        the gap over the deleted text.
+
+        Args:
+            start: An int representing the start of the text to delete.
+            end: An int representing the end of the text to delete.
+        """
+        chars = end - start
+        if chars <= 0:
+            return
+
+        gap = self._before_len
+        if abs(gap - start) <= abs(gap - end):
+            # Deleting forwards from the gap
+            self.move_gap(start)
+            del self._after[len(self._after)-self._after_head_bytes(chars):]
+            self._after_len -= chars
+        else:
+            # Deleting backwards from the gap
+            self.move_gap(end)
+            del self._before[len(self._before)-self._before_tail_bytes(chars):]
+            self._before_len -= chars
@@ -7,13 +7,16 @@ but cannot be tested. IhmacsSansCurses can be tested.
 """
 
 import curses
+from functools import partial
 
 from buff import Buffer
 from view import View
 from controller import Controller
 from basic_editing import (
     command_undefined,
+    self_insert_command,
     DEFAULT_GLOBAL_KEYMAP,
+    SELF_INSERT_KEYS,
 )
 
 
@@ -33,7 +36,8 @@ class IhmacsSansCurses:
         kill_ring: A list (as a stack) of strings representing the kill ring.
             For those not familiar with Emacs reading this code, this is a
             clipboard, with infinite history of copies.
-        echo: A string to display in the echo area.
+        echo: A string to display in the echo area, or a function returning
+            the string to display.
     """
 
     def __init__(self, files):
@@ -189,7 +193,8 @@ class Ihmacs(IhmacsSansCurses):
         kill_ring: A list (as a stack) of strings representing the kill ring.
             For those not familiar with Emacs reading this code, this is a
             clipboard, with infinite history of copies.
-        echo: A string to display in the echo area.
+        echo: A string to display in the echo area, or a function returning
+            the string to display.
         _window: The global ncurses window.
         view: The view in the MVC architecture.
         controller: The controller in the MVC architecture.
@@ -237,6 +242,7 @@ class Ihmacs(IhmacsSansCurses):
         controller = self.controller
         keymap = self.keymap  # This is just the global keymap
         keychord = self.keychord
+        self_insert_keys = read_self_insert_keys(keymap)
 
         # Loop
         while not self.end_session:
@@ -244,7 +250,9 @@ class Ihmacs(IhmacsSansCurses):
             view.refresh_screen()
 
             # Read input
-            keymap = self.active_buff().keymap
+            if self.active_buff().keymap is not keymap:
+                keymap = self.active_buff().keymap
+                self_insert_keys = read_self_insert_keys(keymap)
 
             keychord.clear()
             func = False
@@ -254,18 +262,43 @@ class Ihmacs(IhmacsSansCurses):
 
                 # Read keystrokes
                 controller.read_key()
-                # Test for mapping
-                func = read_keychord_keymap(keychord, keymap)
-                # Echo the current keychord
-                controller.echo(" ".join(keychord))
+                # Test for mapping. Most keystrokes are a single printable key
+                # that inserts itself, so skip walking the keymap for them.
+                if len(keychord) == 1 and keychord[0] in self_insert_keys:
+                    func = self_insert_command
+                else:
+                    func = read_keychord_keymap(keychord, keymap)
+                # Echo the current keychord. Joining it is put off until the
+                # echo area is drawn, which only happens if the keychord is
+                # still incomplete.
+                controller.echo(partial(" ".join, keychord))
 
             # Clear echo area
             controller.echo("")
 
+            # Pasted text arrives as a burst of keystrokes. Insert the rest of
+            # the burst along with this keystroke.
+            if func is self_insert_command:
+                controller.read_burst(self_insert_keys)
+
             # Act on input
             controller.run_edit(func)
 
 
+def read_self_insert_keys(keymap):
+    """
+    Find the printable keys that map straight to self_insert_command.
+
+    Args:
+        keymap: A dictionary representing a keymap.
+
+    Returns:
+        A frozenset of strings representing the keys that self insert.
+    """
+    return frozenset(key for key in SELF_INSERT_KEYS
+                     if keymap.get(key) is self_insert_command)
+
+
 def read_keychord_keymap(keychord, keymap):
     """
     Find the function that a keychord maps to in a keymap.
@@ -0,0 +1,145 @@
+"""
+Newline index used to find lines in a buffer.
+
+The index stores the position of every newline, split in two at a gap like a
+gap buffer. Newlines before the gap are stored as positions from the start of
+the text, and newlines after the gap as distances from the end of the text.
+An edit at the gap changes neither, so a burst of typing only touches the
+newlines it inserts or deletes, no matter how many lines come after it.
+Moving the gap costs time proportional to the number of newlines moved across.
+"""
+
+from bisect import bisect_left, bisect_right
+
+
+def find_newlines(text, offset=0):
+    """
+    Find the positions of all newlines in a string.
+
+    Args:
+        text: A string to search.
+        offset: An int to add to every position found.
+
+    Returns:
+        A list of ints representing the positions of the newlines, plus
+        offset.
+    """
+    positions = []
+    pos = text.find("\n")
+    while pos != -1:
+        positions.append(pos + offset)
+        pos = text.find("\n", pos + 1)
+    return positions
+
+
+class LineIndex:
+    """
+    Sorted positions of the newlines in a text, kept up to date under edits.
+
+    Attributes:
+        _before: A sorted list of ints representing the positions of the
+            newlines before the gap.
+        _after: A sorted list of ints representing the distances from the end
+            of the text to the newlines after the gap, so the newline right
+            after the gap is at the end.
+        _size: An int representing the length of the text.
+    """
+
+    def __init__(self, text=""):
+        """
+        Initialize newline index, with the gap at the end of the text.
+
+        Args:
+            text: A string to index the newlines of.
+        """
+        self._before = find_newlines(text)
+        self._after = []
+        self._size = len(text)
+
+    def __len__(self):
+        """
+        Return the number of newlines in the text.
+        """
+        return len(self._before) + len(self._after)
+
+    def newline(self, index):
+        """
+        Return the position of a newline.
+
+        Args:
+            index: An int representing which newline to find, indexing at 0.
+
+        Returns:
+            An int representing the position of the newline.
+        """
+        before = self._before
+        if index < len(before):
+            return before[index]
+        after = self._after
+        return self._size - after[len(after) - 1 - (index - len(before))]
+
+    def count_before(self, pos):
+        """
+        Return the number of newlines before a position.
+
+        Args:
+            pos: An int representing a position in the text.
+
+        Returns:
+            An int representing how many newlines lie before pos.
+        """
+        before = self._before
+        if before and before[-1] >= pos:
+            return bisect_left(before, pos)
+        after = self._after
+        # Newlines after the gap and before pos are farther from the end of
+        # the text than pos is.
+        return (len(before) + len(after)
+                - bisect_right(after, self._size - pos))
+
+    def insert(self, pos, text):
+        """
+        Update the index for text inserted at a position.
+
+        Args:
+            pos: An int representing where the text was inserted.
+            text: The inserted string.
+        """
+        self._move_gap(pos)
+        self._before.extend(find_newlines(text, pos))
+        self._size += len(text)
+
+    def delete(self, start, end):
+        """
+        Update the index for text deleted between two positions.
+
+        Args:
+            start: An int representing the start of the deleted text.
+            end: An int representing the end of the deleted text.
+        """
+        self._move_gap(start)
+        after = self._after
+        # Drop the deleted newlines, which are the ones right after the gap.
+        del after[bisect_right(after, self._size - end):]
+        self._size -= end - start
+
+    # Helper methods
+
+    def _move_gap(self, pos):
+        """
+        Move the gap so it sits at a position.
+
+        Args:
+            pos: An int representing where to place the gap.
+        """
+        before = self._before
+        after = self._after
+        size = self._size
+        if before and before[-1] >= pos:
+            split = bisect_left(before, pos)
+            after.extend([size - i for i in reversed(before[split:])])
+            del before[split:]
+        elif after and size - after[-1] < pos:
+            split = bisect_right(after, size - pos)
+            before.extend([size - i for i in reversed(after[split:])])
+            del after[split:]
@@ -0,0 +1,376 @@
+"""
+Text scanning helpers for motion commands.
+
+These functions work on the text of a buffer and a position in it, not on the
+global editor state, so they only do string and integer work. This keeps the
+scanning loops run on every motion keystroke in one module, separate from the
+editing commands that call them.
+"""
+
+from collections import deque
+from itertools import chain
+
+
+def unit_end_after(text, pos, delimiter_regex, num=1):
+    """
+    Find the end of the Nth unit after a position.
+
+    Units are separated by a delimiter and end at the start of a delimiter.
+
+    Args:
+        text: A string to search.
+        pos: An int representing where to start searching.
+        delimiter_regex: A compiled regex that searches for instances of the
+            delimiter.
+        num: The number of units to search forward. Must be positive.
+
+    Returns:
+        An int representing the end of the Nth unit after pos, or None if
+        there are fewer than N unit ends after pos.
+    """
+    # Only search from pos, and stop at the end of the nth next unit.
+    unit_ends_found = 0
+    for delimiter in delimiter_regex.finditer(text, pos):
+        if delimiter.start() > pos:
+            unit_ends_found += 1
+            if unit_ends_found == num:
+                return delimiter.start()
+    return None
+
+
+def unit_start_before(text, pos, delimiter_regex, num=1):
+    """
+    Find the start of the Nth unit before a position.
+
+    Units are separated by a delimiter and start at the end of a delimiter.
+
+    Args:
+        text: A string to search.
+        pos: An int representing where to search back from.
+        delimiter_regex: A compiled regex that searches for instances of the
+            delimiter.
+        num: The number of units to search backward. Must be positive.
+
+    Returns:
+        An int representing the start of the Nth unit before pos, or None if
+        there are fewer than N unit starts before pos.
+    """
+    # Only remember the last N starts before pos, and stop searching once pos
+    # is reached.
+    unit_starts = deque(maxlen=num)
+    for delimiter in delimiter_regex.finditer(text):
+        if delimiter.end() >= pos:
+            break
+        unit_starts.append(delimiter.end())
+
+    if len(unit_starts) == num:
+        return unit_starts[0]
+    return None
+
+
+def units_away(text, pos, delimiter_regex, num):
+    """
+    Find the position N units away from a position.
+
+    Args:
+        text: A string to search.
+        pos: An int representing where to start searching.
+        delimiter_regex: A compiled regex that searches for instances of the
+            delimiter.
+        num: The number of units to search forward. If negative, search
+            backward.
+
+    Returns:
+        An int representing the end of the Nth unit after pos, or the start of
+        the Nth unit before pos if N is negative. The end or the start of the
+        text if there are fewer than N units.
+    """
+    if num > 0:
+        new_pos = unit_end_after(text, pos, delimiter_regex, num)
+        return len(text) if new_pos is None else new_pos
+    if num < 0:
+        new_pos = unit_start_before(text, pos, delimiter_regex, -num)
+        return 0 if new_pos is None else new_pos
+    return pos
+
+
+def unit_at(text, pos, unit_regex, window=None):
+    """
+    Find the first unit that spans a position.
+
+    Args:
+        text: A string to search.
+        pos: An int representing the position the unit has to span.
+        unit_regex: A compiled regex that searches for instances of the unit.
+        window: An int representing how many characters before pos to start
+            searching at, or None to search from the start of the text. Only
+            safe for regexes whose matches are runs of a single character
+            class, as a search started mid-text finds the same matches as a
+            full search for those. Matches of other regexes, like one matching
+            two words at a time, can chain differently depending on where the
+            search starts.
+
+    Returns:
+        A tuple of two ints representing the start and end of the first match
+        whose span includes pos, or None if there is no such match.
+    """
+    # Start searching a window before pos rather than at the start of the
+    # text. If the first unit found starts right at the edge of the window,
+    # it may have been cut off, so search the whole text instead. Otherwise,
+    # a unit spanning pos would have been found from inside the window, so
+    # the search is final.
+    search_start = 0
+    if window is not None:
+        search_start = max(0, pos - window)
+    units = unit_regex.finditer(text, search_start)
+    if search_start != 0:
+        first_unit = next(units, None)
+        if first_unit is None:
+            return None
+        if first_unit.start() == search_start:
+            units = unit_regex.finditer(text)
+        else:
+            units = chain([first_unit], units)
+
+    for unit in units:
+        start, end = unit.span()
+        if start > pos:
+            return None
+        if start <= pos <= end:
+            return (start, end)
+    return None
+
+
+# Scanning text is done in chunks, so a motion near point only reads and
+# translates the text near point rather than the whole buffer.
+_CHUNK_SIZE = 4096
+
+
+def _skip_forward(substring, text_len, pos, char_table, delimiters):
+    """
+    Return the first position at or after pos that ends a run of characters.
+
+    Args:
+        substring: A function that takes a start and end position and returns
+            the text between them, such as Buffer.substring.
+        text_len: An int representing the length of the text.
+        pos: An int representing where to start searching.
+        char_table: A translate table mapping every delimiter to "\\0".
+        delimiters: A bool representing whether to skip a run of delimiters,
+            or a run of non delimiters.
+
+    Returns:
+        An int representing the end of the run, or the length of the text if
+        the run reaches the end of the text.
+    """
+    while pos < text_len:
+        chunk = substring(pos, pos + _CHUNK_SIZE).translate(char_table)
+        if delimiters:
+            offset = len(chunk) - len(chunk.lstrip("\0"))
+        else:
+            offset = chunk.find("\0")
+            if offset == -1:
+                offset = len(chunk)
+        if offset < len(chunk):
+            return pos + offset
+        pos += len(chunk)
+    return text_len
+
+
+def _skip_backward(substring, pos, char_table, delimiters):
+    """
+    Return the last position at or before pos that starts a run of characters.
+
+    Args:
+        substring: A function that takes a start and end position and returns
+            the text between them, such as Buffer.substring.
+        pos: An int representing where to search back from.
+        char_table: A translate table mapping every delimiter to "\\0".
+        delimiters: A bool representing whether to skip a run of delimiters,
+            or a run of non delimiters.
+
+    Returns:
+        An int representing the start of the run, or 0 if the run reaches the
+        start of the text.
+    """
+    while pos > 0:
+        chunk_start = max(0, pos - _CHUNK_SIZE)
+        chunk = substring(chunk_start, pos).translate(char_table)
+        if delimiters:
+            offset = len(chunk.rstrip("\0"))
+        else:
+            offset = chunk.rfind("\0") + 1
+        if offset > 0:
+            return chunk_start + offset
+        pos = chunk_start
+    return 0
+
+
+def word_end_after(substring, text_len, pos, char_table, num=1):
+    """
+    Find the end of the Nth word after a position.
+
+    Behaves like unit_end_after, but finds delimiters with a translate table
+    instead of a regex, and only reads the text it needs.
+
+    Args:
+        substring: A function that takes a start and end position and returns
+            the text between them, such as Buffer.substring.
+        text_len: An int representing the length of the text.
+        pos: An int representing where to start searching.
+        char_table: A translate table mapping every delimiter to "\\0".
+        num: The number of words to search forward. Must be positive.
+
+    Returns:
+        An int representing the end of the Nth word after pos, or None if
+        there are fewer than N word ends after pos.
+    """
+    for _ in range(num):
+        pos = _skip_forward(substring, text_len, pos, char_table, True)
+        pos = _skip_forward(substring, text_len, pos, char_table, False)
+        if pos == text_len:
+            return None
+    return pos
+
+
+def word_start_before(substring, pos, char_table, num=1):
+    """
+    Find the start of the Nth word before a position.
+
+    Behaves like unit_start_before, but finds delimiters with a translate
+    table instead of a regex, and only reads the text it needs.
+
+    Args:
+        substring: A function that takes a start and end position and returns
+            the text between them, such as Buffer.substring.
+        pos: An int representing where to search back from.
+        char_table: A translate table mapping every delimiter to "\\0".
+        num: The number of words to search backward. Must be positive.
+
+    Returns:
+        An int representing the start of the Nth word before pos, or None if
+        there are fewer than N word starts before pos.
+    """
+    for _ in range(num):
+        pos = _skip_backward(substring, pos, char_table, True)
+        pos = _skip_backward(substring, pos, char_table, False)
+        if pos == 0:
+            return None
+    return pos
+
+
+def line_end_after(line_span, line_count, line, pos, num=1):
+    """
+    Find the end of the Nth line after a position.
+
+    Behaves like unit_end_after with runs of newlines as the delimiter, so
+    blank lines are skipped, but reads line bounds from a line index instead
+    of searching the text.
+
+    Args:
+        line_span: A function that takes a line number and returns the start
+            and end of that line, such as Buffer.line_span.
+        line_count: An int representing the number of lines in the text.
+        line: An int representing the line pos is on. Line numbers index at 1.
+        pos: An int representing where to start searching.
+        num: The number of lines to search forward. Must be positive.
+
+    Returns:
+        An int representing the end of the Nth line after pos, or None if
+        there are fewer than N line ends after pos.
+    """
+    # The last line ends at the end of the text, not at a newline.
+    for line_num in range(line, line_count):
+        start, end = line_span(line_num)
+        # A blank line's newline is part of the run ending the line before.
+        if end > pos and end > start:
+            num -= 1
+            if num == 0:
+                return end
+    return None
+
+
+def line_start_before(line_span, line_count, line, pos, num=1):
+    """
+    Find the start of the Nth line before a position.
+
+    Behaves like unit_start_before with runs of newlines as the delimiter, so
+    blank lines are skipped, but reads line bounds from a line index instead
+    of searching the text.
+
+    Args:
+        line_span: A function that takes a line number and returns the start
+            and end of that line, such as Buffer.line_span.
+        line_count: An int representing the number of lines in the text.
+        line: An int representing the line pos is on. Line numbers index at 1.
+        pos: An int representing where to search back from.
+        num: The number of lines to search backward. Must be positive.
+
+    Returns:
+        An int representing the start of the Nth line before pos, or None if
+        there are fewer than N line starts before pos.
+    """
+    # The first line starts at the start of the text, not after a newline.
+    for line_num in range(line, 1, -1):
+        start, end = line_span(line_num)
+        # A blank line's start is inside a run of newlines, unless the run
+        # ends the text.
+        if start < pos and (end > start or line_num == line_count):
+            num -= 1
+            if num == 0:
+                return start
+    return None
+
+
+def words_away(substring, text_len, pos, char_table, num):
+    """
+    Find the position N words away from a position.
+
+    Args:
+        substring: A function that takes a start and end position and returns
+            the text between them, such as Buffer.substring.
+        text_len: An int representing the length of the text.
+        pos: An int representing where to start searching.
+        char_table: A translate table mapping every delimiter to "\\0".
+        num: The number of words to search forward. If negative, search
+            backward.
+
+    Returns:
+        An int representing the end of the Nth word after pos, or the start of
+        the Nth word before pos if N is negative. The end or the start of the
+        text if there are fewer than N words.
+    """
+    if num > 0:
+        new_pos = word_end_after(substring, text_len, pos, char_table, num)
+        return text_len if new_pos is None else new_pos
+    if num < 0:
+        new_pos = word_start_before(substring, pos, char_table, -num)
+        return 0 if new_pos is None else new_pos
+    return pos
+
+
+def lines_away(line_span, line_count, line, pos, num):
+    """
+    Find the position N lines away from a position.
+
+    Args:
+        line_span: A function that takes a line number and returns the start
+            and end of that line, such as Buffer.line_span.
+        line_count: An int representing the number of lines in the text.
+        line: An int representing the line pos is on. Line numbers index at 1.
+        pos: An int representing where to start searching.
+        num: The number of lines to search forward. If negative, search
+            backward.
+
+    Returns:
+        An int representing the end of the Nth line after pos, or the start of
+        the Nth line before pos if N is negative. The end or the start of the
+        text if there are fewer than N lines.
+    """
+    if num > 0:
+        new_pos = line_end_after(line_span, line_count, line, pos, num)
+        return line_span(line_count)[1] if new_pos is None else new_pos
+    if num < 0:
+        new_pos = line_start_before(line_span, line_count, line, pos, -num)
+        return 0 if new_pos is None else new_pos
+    return pos
@@ -0,0 +1,37 @@
+"""
+Regular expression engine used by Ihmacs.
+
+Patterns are compiled with Python's re module by default. Setting USE_RE2 to
+True compiles them with google-re2 instead, if it is installed. RE2 matches in
+linear time with a DFA rather than by backtracking, which cuts the per match
+overhead of the simple character class patterns used for motion commands.
+
+RE2 supports the same finditer, search, and span interface as re, including
+the pos argument, so compiled patterns can be used interchangeably. Note that
+in RE2, \\s only matches ASCII whitespace.
+"""
+
+import re
+
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+
+# Feature flag, compile patterns with RE2 when it is available.
+USE_RE2 = False
+
+def compile_regex(pattern):
+    """
+    Compile a regex with the active regex engine.
+
+    Args:
+        pattern: A string representing a regular expression.
+
+    Returns:
+        A compiled regex object from either re or re2.
+    """
+    if USE_RE2 and re2 is not None:
+        return re2.compile(pattern)
+    return re.compile(pattern)
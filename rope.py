@@ -0,0 +1,527 @@
+"""
+Rope implementation used to store the text of a buffer.
+
+A rope is a balanced binary tree whose leaves are short strings. Splitting and
+joining ropes only rebuilds the nodes along a path from the root to a leaf, so
+editing a large buffer does not copy the text that was not touched by the
+edit. Every operation besides flattening the whole rope is O(log N). Since
+nodes are never modified, a snapshot of a rope shares its whole tree with the
+rope, and costs O(log N) to take.
+
+The tree is kept balanced AVL style. Leaves are plain strings, and internal
+nodes are immutable _Node tuples. The helper functions in this module treat a
+string as a leaf node of height 0.
+
+The leaf being edited is taken out of the tree and held in a gap buffer, so a
+run of keystrokes at the cursor does not rebuild the tree at all. The gap
+buffer is put back into the tree (flushed) once an edit lands outside of it.
+"""
+
+from collections import namedtuple
+
+from gap_buffer import GapBuffer
+
+
+# The largest leaf built when loading text into a rope. Small leaves produced
+# by edits are merged back together up to this size.
+LEAF_MAX = 2048
+
+# The largest the gap buffer may grow before it is flushed back into the tree.
+GAP_MAX = 4 * LEAF_MAX
+
+
+# Internal node of a rope. left and right are the subtrees, either _Nodes or
+# string leaves. length is the number of characters in the subtree, and height
+# is the height of the subtree, where leaves have a height of 0.
+#
+# Nodes are never changed once built. An edit builds new nodes along the path
+# it touches and shares every other subtree with the old tree, so keeping an
+# old root around keeps a full copy of the old text for O(log N) memory.
+_Node = namedtuple("_Node", ["left", "right", "length", "height"])
+
+
+def _node(left, right):
+    """
+    Create a node from two subtrees.
+
+    Args:
+        left: The left subtree.
+        right: The right subtree.
+
+    Returns:
+        A _Node with its length and height filled in.
+    """
+    return _Node(left, right, _length(left) + _length(right),
+                 max(_height(left), _height(right)) + 1)
+
+
+def _length(node):
+    """
+    Return the number of characters in a subtree.
+    """
+    if isinstance(node, str):
+        return len(node)
+    return node.length
+
+
+def _height(node):
+    """
+    Return the height of a subtree.
+    """
+    if isinstance(node, str):
+        return 0
+    return node.height
+
+
+def _build(text):
+    """
+    Build a balanced subtree holding text.
+
+    Args:
+        text: A string to store in the subtree.
+
+    Returns:
+        A subtree whose leaves are at most LEAF_MAX characters long.
+    """
+    if len(text) <= LEAF_MAX:
+        return text
+
+    leaves = [text[i:i+LEAF_MAX] for i in range(0, len(text), LEAF_MAX)]
+    return _build_from_leaves(leaves, 0, len(leaves))
+
+
+def _build_from_leaves(leaves, start, end):
+    """
+    Build a perfectly balanced subtree from a slice of a list of leaves.
+    """
+    if end - start == 1:
+        return leaves[start]
+    middle = (start + end) // 2
+    return _node(_build_from_leaves(leaves, start, middle),
+                 _build_from_leaves(leaves, middle, end))
+
+
+def _balance(left, right):
+    """
+    Create a node from two subtrees, rotating if their heights diverge.
+
+    The heights of the subtrees may differ by at most 2, which is the most a
+    single join can unbalance a tree by.
+
+    Args:
+        left: The left subtree.
+        right: The right subtree.
+
+    Returns:
+        A balanced subtree containing left followed by right.
+    """
+    left_height = _height(left)
+    right_height = _height(right)
+
+    if left_height > right_height + 1:
+        if _height(left.left) >= _height(left.right):
+            # Single right rotation
+            return _node(left.left, _node(left.right, right))
+        # Double rotation
+        pivot = left.right
+        return _node(_node(left.left, pivot.left),
+                     _node(pivot.right, right))
+
+    if right_height > left_height + 1:
+        if _height(right.right) >= _height(right.left):
+            # Single left rotation
+            return _node(_node(left, right.left), right.right)
+        # Double rotation
+        pivot = right.left
+        return _node(_node(left, pivot.left),
+                     _node(pivot.right, right.right))
+
+    return _node(left, right)
+
+
+def _join(left, right):
+    """
+    Concatenate two subtrees.
+
+    Walks down the spine of the taller tree until the heights match, so the
+    cost is proportional to the difference in heights.
+
+    Args:
+        left: The subtree holding the start of the text.
+        right: The subtree holding the end of the text.
+
+    Returns:
+        A balanced subtree containing left followed by right.
+    """
+    if _length(left) == 0:
+        return right
+    if _length(right) == 0:
+        return left
+
+    # Merge small leaves so edits do not leave behind lots of tiny leaves.
+    if (isinstance(left, str) and isinstance(right, str)
+            and len(left) + len(right) <= LEAF_MAX):
+        return left + right
+
+    left_height = _height(left)
+    right_height = _height(right)
+
+    if left_height > right_height + 1:
+        return _balance(left.left, _join(left.right, right))
+    if right_height > left_height + 1:
+        return _balance(_join(left, right.left), right.right)
+    return _node(left, right)
+
+
+def _split(node, index):
+    """
+    Split a subtree into two at index.
+
+    Args:
+        node: The subtree to split.
+        index: An int representing where to split the text. Must lie between
+            0 and the length of the subtree.
+
+    Returns:
+        A tuple of two subtrees. The first holds the text before index, and
+        the second holds the text at and after index.
+    """
+    if isinstance(node, str):
+        return (node[:index], node[index:])
+
+    left_length = _length(node.left)
+    if index < left_length:
+        left, right = _split(node.left, index)
+        return (left, _join(right, node.right))
+    if index > left_length:
+        left, right = _split(node.right, index - left_length)
+        return (_join(node.left, left), right)
+    return (node.left, node.right)
+
+
+def _leaf_at(node, pos):
+    """
+    Find the leaf of a subtree containing a position.
+
+    A position on the boundary between two leaves belongs to the leaf on the
+    left, so the end of the text belongs to the last leaf.
+
+    Args:
+        node: The subtree to search.
+        pos: An int representing a position within the subtree.
+
+    Returns:
+        A tuple containing the leaf string and an int representing the
+        position of the start of the leaf within the subtree.
+    """
+    offset = 0
+    while not isinstance(node, str):
+        left_length = _length(node.left)
+        if pos <= left_length:
+            node = node.left
+        else:
+            pos -= left_length
+            offset += left_length
+            node = node.right
+    return (node, offset)
+
+
+def _leaves(node):
+    """
+    Yield the leaves of a subtree from left to right.
+    """
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            yield node
+        else:
+            stack.append(node.right)
+            stack.append(node.left)
+
+
+def _collect(node, start, end, pieces):
+    """
+    Append the pieces of text between start and end in a subtree to a list.
+
+    Args:
+        node: The subtree to read from.
+        start: An int representing the start of the range within the subtree.
+        end: An int representing the end of the range within the subtree.
+        pieces: A list of strings to append the text to.
+    """
+    if start >= end:
+        return
+    if isinstance(node, str):
+        pieces.append(node[start:end])
+        return
+    if start == 0 and end == node.length:
+        pieces.extend(_leaves(node))
+        return
+
+    left_length = _length(node.left)
+    if start < left_length:
+        _collect(node.left, start, min(end, left_length), pieces)
+    if end > left_length:
+        _collect(node.right, max(0, start - left_length), end - left_length,
+                 pieces)
+
+
+class Rope:
+    """
+    Mutable text sequence stored as a balanced tree of strings.
+
+    Attributes:
+        _root: The root of the tree, either a _Node or a string leaf. While a
+            gap buffer is open, the tree does not contain the gap buffer text.
+        _gap: A GapBuffer holding the leaf being edited, or None if no leaf
+            is being edited.
+        _gap_start: An int representing the position in the text where the
+            gap buffer text starts.
+    """
+
+    def __init__(self, text=""):
+        """
+        Initialize rope.
+
+        Args:
+            text: A string to initially fill the rope with.
+        """
+        self._root = _build(text)
+        self._gap = None
+        self._gap_start = 0
+
+    @classmethod
+    def _from_root(cls, root):
+        """
+        Create a rope wrapping an existing tree.
+        """
+        rope = cls()
+        rope._root = root
+        return rope
+
+    def __len__(self):
+        """
+        Return the number of characters in the rope.
+        """
+        if self._gap is None:
+            return _length(self._root)
+        return _length(self._root) + len(self._gap)
+
+    def __str__(self):
+        """
+        Return the text in the rope as a single string.
+        """
+        if self._gap is None:
+            return "".join(_leaves(self._root))
+        return self.substring(0, len(self))
+
+    @property
+    def height(self):
+        """
+        Return the height of the tree.
+        """
+        return _height(self._root)
+
+    # Helper methods
+
+    def _normalize_pos(self, pos):
+        """
+        Clamp a position to lie between 0 and the length of the rope.
+        """
+        return max(0, min(pos, len(self)))
+
+    def _in_gap(self, start, end):
+        """
+        Return whether a range of text lies within the open gap buffer.
+        """
+        gap_start = self._gap_start
+        return (self._gap is not None
+                and gap_start <= start
+                and end <= gap_start + len(self._gap))
+
+    def _flush(self):
+        """
+        Put the text of the open gap buffer back into the tree.
+        """
+        if self._gap is None:
+            return
+        left, right = _split(self._root, self._gap_start)
+        self._root = _join(_join(left, _build(str(self._gap))), right)
+        self._gap = None
+        self._gap_start = 0
+
+    def _open_gap(self, pos):
+        """
+        Move the leaf containing a position out of the tree into a gap buffer.
+
+        Flushes any gap buffer that is already open.
+
+        Args:
+            pos: An int representing a position in the rope.
+        """
+        self._flush()
+        leaf, offset = _leaf_at(self._root, pos)
+        left, rest = _split(self._root, offset)
+        _, right = _split(rest, len(leaf))
+        self._root = _join(left, right)
+        self._gap = GapBuffer(leaf, pos - offset)
+        self._gap_start = offset
+
+    # Reading
+
+    def index(self, pos):
+        """
+        Return the character at a position in the rope.
+
+        Args:
+            pos: An int representing the position of the character.
+
+        Returns:
+            A string containing the character at pos.
+
+        Raises:
+            IndexError: If pos does not lie within the rope.
+        """
+        if not 0 <= pos < len(self):
+            raise IndexError("rope index out of range")
+
+        if self._gap is not None:
+            gap_start = self._gap_start
+            gap_len = len(self._gap)
+            if gap_start <= pos < gap_start + gap_len:
+                return self._gap.index(pos - gap_start)
+            if pos >= gap_start + gap_len:
+                pos -= gap_len
+
+        node = self._root
+        while not isinstance(node, str):
+            left_length = _length(node.left)
+            if pos < left_length:
+                node = node.left
+            else:
+                pos -= left_length
+                node = node.right
+        return node[pos]
+
+    def substring(self, start, end):
+        """
+        Return the text between two positions.
+
+        Positions are clamped to the range of the rope, like slicing a string.
+
+        Args:
+            start: An int representing the start of the text.
+            end: An int representing the end of the text.
+
+        Returns:
+            A string containing the text between start and end.
+        """
+        start = self._normalize_pos(start)
+        end = self._normalize_pos(end)
+        pieces = []
+        if self._gap is None:
+            _collect(self._root, start, end, pieces)
+            return "".join(pieces)
+
+        # Tree text before the gap buffer, the gap buffer, then the tree text
+        # after the gap buffer.
+        gap_start = self._gap_start
+        gap_end = gap_start + len(self._gap)
+        _collect(self._root, start, min(end, gap_start), pieces)
+        if start < gap_end and end > gap_start:
+            pieces.append(self._gap.substring(max(start, gap_start) - gap_start,
+                                              min(end, gap_end) - gap_start))
+        _collect(self._root,
+                 max(start, gap_end) - len(self._gap),
+                 end - len(self._gap),
+                 pieces)
+        return "".join(pieces)
+
+    # Structural operations
+
+    def snapshot(self):
+        """
+        Return a copy of the rope that shares its tree with this rope.
+
+        The text of the open gap buffer is copied into the tree of the
+        snapshot, which costs time proportional to the size of the gap buffer.
+        This rope's gap buffer is left open.
+
+        Returns:
+            A new Rope holding the same text. Editing either rope does not
+            change the text of the other.
+        """
+        if self._gap is None:
+            return Rope._from_root(self._root)
+        left, right = _split(self._root, self._gap_start)
+        return Rope._from_root(
+            _join(_join(left, _build(str(self._gap))), right))
+
+    def split(self, pos):
+        """
+        Split the rope into two new ropes at a position.
+
+        Args:
+            pos: An int representing where to split the rope.
+
+        Returns:
+            A tuple of two Ropes, the text before pos and the text after pos.
+            The original rope's text is not modified.
+        """
+        self._flush()
+        left, right = _split(self._root, self._normalize_pos(pos))
+        return (Rope._from_root(left), Rope._from_root(right))
+
+    # Editing
+
+    def insert(self, pos, text):
+        """
+        Insert text into the rope at a position.
+
+        Small inserts go through the gap buffer. Text longer than a leaf is
+        joined straight into the tree.
+
+        Args:
+            pos: An int representing where to insert the text.
+            text: A string to insert.
+        """
+        if text == "":
+            return
+        pos = self._normalize_pos(pos)
+
+        if len(text) > LEAF_MAX:
+            self._flush()
+            left, right = _split(self._root, pos)
+            self._root = _join(_join(left, _build(text)), right)
+            return
+
+        if not self._in_gap(pos, pos):
+            self._open_gap(pos)
+        self._gap.insert(pos - self._gap_start, text)
+
+        if len(self._gap) > GAP_MAX:
+            self._flush()
+
+    def delete(self, start, end):
+        """
+        Delete the text between two positions.
+
+        Args:
+            start: An int representing the start of the text to delete.
+            end: An int representing the end of the text to delete.
+        """
+        start = self._normalize_pos(start)
+        end = self._normalize_pos(end)
+        if start >= end:
+            return
+
+        if self._in_gap(start, end):
+            gap_start = self._gap_start
+            self._gap.delete(start - gap_start, end - gap_start)
+            return
+
+        self._flush()
+        left, rest = _split(self._root, start)
+        _, right = _split(rest, end - start)
+        self._root = _join(left, right)
@@ -4,10 +4,13 @@ Unit tests for editing commands.
 
 #pylint: skip-file
 
+import re
+
 import pytest
 
 from ihmacs_class import IhmacsSansCurses
 from buff import Buffer
+from rope import Rope
 
 # Recycle this fantastic set of cases
 from test_buff import (
@@ -35,9 +38,17 @@ from basic_editing import (
     point_min,
     point_forward_by_delimiter,
     point_backward_by_delimiter,
+    forward_word,
+    backward_word,
     beginning_of_buffer,
     end_of_buffer,
+    move_end_of_line,
+    move_beginning_of_line,
+    previous_line,
+    next_line,
     thing_at_point_regex,
+    line_at_point,
+    word_at_point,
     kill_append,
     kill_ring_save,
     kill_forward_by_delimiter,
@@ -61,7 +72,7 @@ def buff(request):
     buff = Buffer()
 
     # Directly set attributes, do not depend on methods for tests.
-    buff._text = text
+    buff._text = Rope(text)
     buff._point = point
     buff._mark = mark
     return buff
@@ -499,6 +510,255 @@ def test_end_of_buffer(ihmacs_state):
     assert expected_point == buff.point
 
 
+# forward_word
+def test_forward_word(ihmacs_state, times):
+    """
+    Test that point moves to the end of the Nth next word.
+
+    Inserts text first, so the words are read from the rope rather than the
+    cached buffer text.
+
+    Args:
+        ihmacs_state: An instance of IhmacsSansCurses.
+        times: An int representing how many words to move.
+    """
+    buff = ihmacs_state.active_buff()
+    insert(ihmacs_state, "new words ")
+    delimiter_regex = buff.major_mode.word_delimiters_regex
+    expected_point = point_forward_by_delimiter(ihmacs_state,
+                                                delimiter_regex,
+                                                num=times)
+    if times == 0:
+        expected_point = buff.point
+    buff._text_cache = None
+
+    forward_word(ihmacs_state, times)
+
+    assert expected_point == buff.point
+    assert buff._text_cache is None
+
+
+# backward_word
+def test_backward_word(ihmacs_state, times):
+    """
+    Test that point moves to the start of the Nth previous word.
+
+    Inserts text first, so the words are read from the rope rather than the
+    cached buffer text.
+
+    Args:
+        ihmacs_state: An instance of IhmacsSansCurses.
+        times: An int representing how many words to move.
+    """
+    buff = ihmacs_state.active_buff()
+    insert(ihmacs_state, " new words")
+    delimiter_regex = buff.major_mode.word_delimiters_regex
+    expected_point = point_backward_by_delimiter(ihmacs_state,
+                                                 delimiter_regex,
+                                                 num=times)
+    if times == 0:
+        expected_point = buff.point
+    buff._text_cache = None
+
+    backward_word(ihmacs_state, times)
+
+    assert expected_point == buff.point
+    assert buff._text_cache is None
+
+
+# move_end_of_line
+def test_move_end_of_line(ihmacs_state):
+    """
+    Test that point is moved to the newline ending the current line.
+
+    Args:
+        ihmacs_state: An instance of IhmacsSansCurses.
+    """
+    buff = ihmacs_state.active_buff()
+    og_point = buff.point
+    text = buff.text
+
+    move_end_of_line(ihmacs_state)
+
+    new_point = buff.point
+    assert "\n" not in text[og_point:new_point]
+    assert new_point == len(text) or text[new_point] == "\n"
+
+
+# move_beginning_of_line
+def test_move_beginning_of_line(ihmacs_state):
+    """
+    Test that point is moved to the character after the previous newline.
+
+    Args:
+        ihmacs_state: An instance of IhmacsSansCurses.
+    """
+    buff = ihmacs_state.active_buff()
+    og_point = buff.point
+    text = buff.text
+
+    move_beginning_of_line(ihmacs_state)
+
+    new_point = buff.point
+    assert "\n" not in text[new_point:og_point]
+    assert new_point == 0 or text[new_point-1] == "\n"
+
+
+# next_line
+def test_next_line(ihmacs_state, times):
+    """
+    Test that point moves down N lines, keeping the column if it can.
+
+    Args:
+        ihmacs_state: An instance of IhmacsSansCurses.
+        times: An integer representing the number of lines to move.
+    """
+    buff = ihmacs_state.active_buff()
+    og_line = buff.line
+    og_column = buff.column
+    expected_line = min(og_line + times, buff.line_count)
+
+    next_line(ihmacs_state, num=times)
+
+    lines = buff.text.split("\n")
+    if og_line + times > buff.line_count:
+        # Ran out of lines, so point goes to the end of the buffer.
+        expected_column = len(lines[-1])
+    else:
+        expected_column = min(og_column, len(lines[expected_line - 1]))
+    assert (expected_line, expected_column) == (buff.line, buff.column)
+
+
+# previous_line
+def test_previous_line(ihmacs_state, times):
+    """
+    Test that point moves up N lines, keeping the column if it can.
+
+    Args:
+        ihmacs_state: An instance of IhmacsSansCurses.
+        times: An integer representing the number of lines to move.
+    """
+    buff = ihmacs_state.active_buff()
+    og_line = buff.line
+    og_column = buff.column
+    expected_line = max(og_line - times, 1)
+
+    previous_line(ihmacs_state, num=times)
+
+    lines = buff.text.split("\n")
+    if og_line - times < 1:
+        # Ran out of lines, so point goes to the start of the buffer.
+        expected_column = 0
+    else:
+        expected_column = min(og_column, len(lines[expected_line - 1]))
+    assert (expected_line, expected_column) == (buff.line, buff.column)
+
+
+# thing_at_point_regex
+@pytest.mark.parametrize("point", [0, 5000, 30000, 44500])
+def test_thing_at_point_regex_long_buffer(point):
+    """
+    Test finding the line at point in a buffer longer than the search window.
+
+    Args:
+        point: An int representing where to place point.
+    """
+    ihmacs_state = IhmacsSansCurses([])
+    buff = ihmacs_state.active_buff()
+    buff._text = Rope(LOREM_IPSUM * 100)
+    buff._point = point
+
+    lines = buff.text.split("\n")
+    expected_line = lines[buff.line - 1]
+    line_regex = re.compile("^.*$", re.MULTILINE)
+
+    assert expected_line == thing_at_point_regex(ihmacs_state, line_regex)
+
+
+def test_thing_at_point_regex_spanning_words():
+    """
+    Test a regex whose matches span two words in a long buffer.
+
+    Where a search starts changes which words these matches pair up, so the
+    thing at point has to match a search of the whole buffer.
+    """
+    ihmacs_state = IhmacsSansCurses([])
+    buff = ihmacs_state.active_buff()
+    buff._text = Rope("".join(f"w{i:04d} " for i in range(2000)))
+    buff._point = 6009
+
+    two_words_regex = re.compile(r"\w+ \w+")
+
+    assert "w1000 w1001" == thing_at_point_regex(ihmacs_state,
+                                                 two_words_regex)
+
+
+@pytest.mark.parametrize("point", [0, 5000, 30000, 44500])
+def test_word_at_point_long_buffer(point):
+    """
+    Test finding the word at point in a buffer longer than the search window.
+
+    Args:
+        point: An int representing where to place point.
+    """
+    ihmacs_state = IhmacsSansCurses([])
+    buff = ihmacs_state.active_buff()
+    buff._text = Rope(LOREM_IPSUM * 100)
+    buff._point = point
+
+    word_regex = buff.major_mode.word_regex
+    expected_word = ""
+    for word in word_regex.finditer(buff.text):
+        if word.start() <= point <= word.end():
+            expected_word = word.group()
+            break
+
+    assert expected_word == word_at_point(ihmacs_state)
+
+
+def test_word_at_point_between_words_long_buffer(monkeypatch):
+    """
+    Test that point between words deep in a long buffer is not at a word.
+
+    A window that finds words, none of them at point, is enough to know
+    there is no word at point, so the whole buffer is not searched.
+    """
+    ihmacs_state = IhmacsSansCurses([])
+    buff = ihmacs_state.active_buff()
+    buff._text = Rope("abcd " * 2000 + "      " + "abcd " * 2000)
+    # Inside the run of spaces, with the edge of the search window on a space
+    buff._point = 10005
+
+    full_searches = []
+    word_regex = buff.major_mode.word_regex
+
+    class SpyRegex:
+        def finditer(self, text, pos=0):
+            if pos == 0:
+                full_searches.append(pos)
+            return word_regex.finditer(text, pos)
+
+    monkeypatch.setattr(buff.major_mode, "_word_regex", SpyRegex())
+
+    assert "" == word_at_point(ihmacs_state)
+    assert full_searches == []
+
+
+# line_at_point
+def test_line_at_point(ihmacs_state):
+    """
+    Test that the line at point is one of the lines in the buffer.
+
+    Args:
+        ihmacs_state: An instance of IhmacsSansCurses.
+    """
+    buff = ihmacs_state.active_buff()
+    lines = buff.text.split("\n")
+    expected_line = lines[buff.line - 1]
+
+    assert expected_line == line_at_point(ihmacs_state)
+
+
 # kill_append
 def test_kill_append(ihmacs_state, insert_string):
     """
@@ -540,3 +800,50 @@ def test_kill_ring_save(ihmacs_state):
                     "does not insert empty string.")
     kill_ring_save(ihmacs_state)
     assert expected_kill == ihmacs_state.kill_ring[-1]
+
+
+# The commands killing by lines and words, and the delimiters they should
+# behave like.
+NEWLINES = re.compile(r"\n+")
+
+kill_commands = [
+    (kill_line, 1, lambda buff: NEWLINES),
+    (backward_kill_line, -1, lambda buff: NEWLINES),
+    (forward_kill_word, 1,
+     lambda buff: buff.major_mode.word_delimiters_regex),
+    (backward_kill_word, -1,
+     lambda buff: buff.major_mode.word_delimiters_regex),
+]
+
+
+@pytest.mark.parametrize("command,direction,delimiter", kill_commands)
+def test_kill_lines_and_words(ihmacs_state, times, command, direction,
+                              delimiter):
+    """
+    Test that killing N lines or words kills the same text as killing by
+    their delimiter.
+
+    Args:
+        ihmacs_state: An instance of IhmacsSansCurses.
+        times: An int representing how many lines or words to kill.
+        command: The kill command to test.
+        direction: 1 if the command kills forwards, -1 if backwards.
+        delimiter: A function returning the delimiter regex for a buffer.
+    """
+    buff = ihmacs_state.active_buff()
+    text = buff.text
+    point = buff.point
+    kill_point = point
+    if times:
+        kill_point = point_forward_by_delimiter(ihmacs_state,
+                                                delimiter(buff),
+                                                num=direction * times)
+    start = min(point, kill_point)
+    end = max(point, kill_point)
+
+    command(ihmacs_state, times)
+
+    assert buff.text == text[:start] + text[end:]
+    assert buff.point == start
+    if start != end:
+        assert ihmacs_state.kill_ring[-1] == text[start:end]
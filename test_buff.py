@@ -10,7 +10,8 @@ being used by the project.
 
 import pytest
 
-from buff import Buffer
+from buff import Buffer, UNDO_GROUP_MAX
+from rope import Rope
 
 
 LOREM_IPSUM = (
@@ -58,7 +59,7 @@ def buff(request):
     buff = Buffer()
 
     # Directly set attributes, do not depend on methods that I am testing.
-    buff._text = text
+    buff._text = Rope(text)
     buff._point = point
     buff._mark = mark
     return buff
@@ -76,7 +77,7 @@ def buff_read_only(request):
     buff = Buffer(read_only=True)
 
     # Directly set attributes, do not depend on methods that I am testing.
-    buff._text = text
+    buff._text = Rope(text)
     buff._point = point
     buff._mark = mark
     return buff
@@ -671,3 +672,258 @@ def test_append_modified(buff, insert_string):
     """
     buff.append(insert_string)
     assert buff.modified
+
+
+# Line index
+def line_info(buff):
+    """
+    Return the line, column, and line count of a buffer computed from text.
+    """
+    text = buff.text
+    point = buff.point
+    line = text[:point].count("\n") + 1
+    column = point - (text.rfind("\n", 0, point) + 1)
+    return (line, column, text.count("\n") + 1)
+
+
+def test_line_column(buff):
+    """
+    Check line, column, and line count against the buffer text.
+
+    Args:
+        buff: An Ihmacs buffer.
+    """
+    assert line_info(buff) == (buff.line, buff.column, buff.line_count)
+
+
+def test_insert_line_column(buff, insert_string):
+    """
+    Check that the newline index is kept up to date by insert.
+
+    Args:
+        buff: An Ihmacs buffer.
+        insert_string: A string to insert into the buffer.
+    """
+    # Build the newline index before editing.
+    buff.line
+
+    buff.insert(insert_string)
+    assert line_info(buff) == (buff.line, buff.column, buff.line_count)
+
+
+def test_delete_char_line_column(buff, chars):
+    """
+    Check that the newline index is kept up to date by delete_char.
+
+    Args:
+        buff: An Ihmacs buffer.
+        chars: Number of characters to delete.
+    """
+    # Build the newline index before editing.
+    buff.line
+
+    buff.delete_char(chars)
+    assert line_info(buff) == (buff.line, buff.column, buff.line_count)
+
+
+def test_delete_region_line_column(buff):
+    """
+    Check that the newline index is kept up to date by delete_region.
+
+    Args:
+        buff: An Ihmacs buffer.
+    """
+    # Build the newline index before editing.
+    buff.line
+
+    buff.delete_region()
+    assert line_info(buff) == (buff.line, buff.column, buff.line_count)
+
+
+def test_append_line_count(buff, insert_string):
+    """
+    Check that the newline index is kept up to date by append.
+
+    Args:
+        buff: An Ihmacs buffer.
+        insert_string: A string to append to the buffer.
+    """
+    # Build the newline index before editing.
+    buff.line
+
+    buff.append(insert_string)
+    assert line_info(buff) == (buff.line, buff.column, buff.line_count)
+
+
+@pytest.mark.parametrize("line", range(-1, 10))
+def test_line_span(buff, line):
+    """
+    Check that line_span gives the bounds of a line in the buffer text.
+
+    Args:
+        buff: An Ihmacs buffer.
+        line: An int representing a line number.
+    """
+    lines = buff.text.split("\n")
+    expected_line = lines[max(0, min(line, len(lines)) - 1)]
+
+    start, end = buff.line_span(line)
+    assert expected_line == buff.text[start:end]
+
+
+def test_typing_near_start_of_large_buffer():
+    """
+    Check that typing near the start of a large buffer keeps the newline
+    index right without rewriting the newlines after point.
+    """
+    buff = Buffer()
+    buff._text = Rope(("x" * 49 + "\n") * 20000)
+    buff._point = 10
+    # Build the newline index before editing.
+    buff.line
+    buff.insert("a")
+    newlines_after = list(buff._newlines._after)
+
+    for char in "typing\nnear the top " * 100:
+        buff.insert(char)
+        buff.line
+
+    assert buff._newlines._after == newlines_after
+    assert line_info(buff) == (buff.line, buff.column, buff.line_count)
+
+
+# Text cache
+
+@pytest.mark.parametrize("start", range(-5, 450, 37))
+@pytest.mark.parametrize("length", [0, 1, 70, 500])
+def test_substring(buff, start, length):
+    """
+    Check that substring matches slicing the buffer text.
+
+    Both the rope and the cached text are read from, as the text is only
+    cached after the first time it is read.
+
+    Args:
+        buff: An Ihmacs buffer.
+        start: An int representing the start of the text.
+        length: An int representing the length of the text.
+    """
+    end = start + length
+    uncached = buff.substring(start, end)
+
+    text = buff.text
+    expected = text[max(0, start):max(0, end)]
+    assert uncached == expected
+    assert buff.substring(start, end) == expected
+
+
+def test_size(buff, insert_string):
+    """
+    Check that size is the length of the buffer text after an edit.
+
+    Args:
+        buff: An Ihmacs buffer.
+        insert_string: A string to insert into the buffer.
+    """
+    # Cache the text before editing.
+    buff.text
+
+    buff.insert(insert_string)
+    assert buff.size == len(buff.text)
+
+
+# Undo
+
+def test_undo(buff, insert_string, chars):
+    """
+    Check that undo steps back through edits one at a time.
+
+    Args:
+        buff: An Ihmacs buffer.
+        insert_string: A string to insert into the buffer.
+        chars: Number of characters to delete.
+    """
+    edits = [lambda: buff.insert(insert_string),
+             lambda: buff.delete_char(chars),
+             buff.delete_region]
+
+    # Edits that change nothing are not remembered.
+    states = []
+    for edit in edits:
+        state = (buff.text, buff.point, buff.mark)
+        edit()
+        if buff.text != state[0]:
+            states.append(state)
+
+    while states:
+        assert buff.undo()
+        assert (buff.text, buff.point, buff.mark) == states.pop()
+    assert not buff.undo()
+
+
+def test_undo_read_only(buff_read_only, insert_string):
+    """
+    Check that a read only buffer has nothing to undo.
+
+    Args:
+        buff_read_only: An Ihmacs buffer that is read only.
+        insert_string: A string to insert into the buffer.
+    """
+    buff_read_only.insert(insert_string)
+    assert not buff_read_only.undo()
+
+
+def test_undo_groups_typing(buff):
+    """
+    Check that typing a character at a time is undone in groups.
+
+    Args:
+        buff: An Ihmacs buffer.
+    """
+    state = (buff.text, buff.point, buff.mark)
+    for char in "x" * UNDO_GROUP_MAX:
+        buff.insert(char)
+    typed_state = (buff.text, buff.point, buff.mark)
+    buff.insert("y")
+
+    assert buff.undo()
+    assert (buff.text, buff.point, buff.mark) == typed_state
+    assert buff.undo()
+    assert (buff.text, buff.point, buff.mark) == state
+    assert not buff.undo()
+
+
+def test_undo_groups_by_kind(buff):
+    """
+    Check that typing and then backspacing are separate undo steps.
+
+    Args:
+        buff: An Ihmacs buffer.
+    """
+    state = (buff.text, buff.point, buff.mark)
+    for char in "abc":
+        buff.insert(char)
+    typed_state = (buff.text, buff.point, buff.mark)
+    buff.delete_char(-1)
+    buff.delete_char(-1)
+
+    assert buff.undo()
+    assert (buff.text, buff.point, buff.mark) == typed_state
+    assert buff.undo()
+    assert (buff.text, buff.point, buff.mark) == state
+
+
+def test_undo_group_ends_when_point_moves(buff):
+    """
+    Check that typing somewhere else starts a new undo step.
+
+    Args:
+        buff: An Ihmacs buffer.
+    """
+    buff.insert("a")
+    typed_state = (buff.text, buff.point, buff.mark)
+    buff.set_point(0)
+    buff.insert("b")
+
+    assert buff.undo()
+    assert buff.text == typed_state[0]
@@ -0,0 +1,141 @@
+"""
+Unit tests for the GapBuffer class.
+
+Each operation is checked against the equivalent operation on a plain string.
+"""
+
+
+#pylint: skip-file
+
+import pytest
+
+from gap_buffer import GapBuffer
+
+from test_buff import LOREM_IPSUM
+
+
+gaps = [0, 1, 64, 200, len(LOREM_IPSUM)]
+
+positions = [0, 1, 63, 64, 65, 300, len(LOREM_IPSUM)]
+
+
+@pytest.mark.parametrize("gap", gaps)
+def test_str(gap):
+    """
+    Test that the text is the same wherever the gap is placed.
+    """
+    assert str(GapBuffer(LOREM_IPSUM, gap)) == LOREM_IPSUM
+
+
+@pytest.mark.parametrize("gap", gaps)
+@pytest.mark.parametrize("pos", positions)
+def test_move_gap(gap, pos):
+    """
+    Test that moving the gap does not change the text.
+    """
+    gap_buffer = GapBuffer(LOREM_IPSUM, gap)
+    gap_buffer.move_gap(pos)
+
+    assert gap_buffer.gap == pos
+    assert str(gap_buffer) == LOREM_IPSUM
+
+
+@pytest.mark.parametrize("gap", gaps)
+@pytest.mark.parametrize("start", positions)
+@pytest.mark.parametrize("length", [0, 1, 50])
+def test_substring(gap, start, length):
+    """
+    Test that substring matches slicing the text.
+    """
+    gap_buffer = GapBuffer(LOREM_IPSUM, gap)
+    end = min(start + length, len(LOREM_IPSUM))
+
+    assert gap_buffer.substring(start, end) == LOREM_IPSUM[start:end]
+
+
+@pytest.mark.parametrize("gap", gaps)
+@pytest.mark.parametrize("pos", positions[:-1])
+def test_index(gap, pos):
+    """
+    Test that index returns the character at a position.
+    """
+    assert GapBuffer(LOREM_IPSUM, gap).index(pos) == LOREM_IPSUM[pos]
+
+
+@pytest.mark.parametrize("gap", gaps)
+@pytest.mark.parametrize("pos", positions)
+@pytest.mark.parametrize("insert_text", ["", "x", "New\nline"])
+def test_insert(gap, pos, insert_text):
+    """
+    Test inserting text at any position.
+    """
+    gap_buffer = GapBuffer(LOREM_IPSUM, gap)
+    gap_buffer.insert(pos, insert_text)
+
+    assert str(gap_buffer) == LOREM_IPSUM[:pos] + insert_text + \
+        LOREM_IPSUM[pos:]
+    assert gap_buffer.gap == pos + len(insert_text)
+
+
+@pytest.mark.parametrize("gap", gaps)
+@pytest.mark.parametrize("start", positions)
+@pytest.mark.parametrize("length", [0, 1, 50])
+def test_delete(gap, start, length):
+    """
+    Test deleting text from any position.
+    """
+    gap_buffer = GapBuffer(LOREM_IPSUM, gap)
+    end = min(start + length, len(LOREM_IPSUM))
+    gap_buffer.delete(start, end)
+
+    assert str(gap_buffer) == LOREM_IPSUM[:start] + LOREM_IPSUM[end:]
+
+
+# Characters that take 2, 3, and 4 bytes in UTF-8
+UNICODE_TEXT = "Café crème\nNaïve — résumé 😀 done"
+
+unicode_positions = [0, 3, 4, 5, 11, 28, 29, len(UNICODE_TEXT)]
+
+
+@pytest.mark.parametrize("gap", unicode_positions)
+@pytest.mark.parametrize("pos", unicode_positions)
+@pytest.mark.parametrize("insert_text", ["x", "é😀\n"])
+def test_insert_unicode(gap, pos, insert_text):
+    """
+    Test inserting into text with multi-byte characters.
+    """
+    gap_buffer = GapBuffer(UNICODE_TEXT, gap)
+    gap_buffer.insert(pos, insert_text)
+
+    expected_text = UNICODE_TEXT[:pos] + insert_text + UNICODE_TEXT[pos:]
+    assert str(gap_buffer) == expected_text
+    assert len(gap_buffer) == len(expected_text)
+
+
+@pytest.mark.parametrize("gap", unicode_positions)
+@pytest.mark.parametrize("start", unicode_positions)
+@pytest.mark.parametrize("length", [0, 1, 2, 10])
+def test_delete_unicode(gap, start, length):
+    """
+    Test deleting from text with multi-byte characters.
+    """
+    gap_buffer = GapBuffer(UNICODE_TEXT, gap)
+    end = min(start + length, len(UNICODE_TEXT))
+    gap_buffer.delete(start, end)
+
+    expected_text = UNICODE_TEXT[:start] + UNICODE_TEXT[end:]
+    assert str(gap_buffer) == expected_text
+    assert len(gap_buffer) == len(expected_text)
+
+
+@pytest.mark.parametrize("gap", unicode_positions)
+@pytest.mark.parametrize("start", unicode_positions)
+@pytest.mark.parametrize("length", [0, 1, 2, 10])
+def test_substring_unicode(gap, start, length):
+    """
+    Test reading text with multi-byte characters around the gap.
+    """
+    gap_buffer = GapBuffer(UNICODE_TEXT, gap)
+    end = min(start + length, len(UNICODE_TEXT))
+
+    assert gap_buffer.substring(start, end) == UNICODE_TEXT[start:end]
@@ -13,8 +13,14 @@ is unpredictable.
 
 import pytest
 
-from ihmacs_class import IhmacsSansCurses
+from ihmacs_class import IhmacsSansCurses, read_self_insert_keys
 from buff import Buffer
+from basic_editing import (
+    command_undefined,
+    self_insert_command,
+    DEFAULT_GLOBAL_KEYMAP,
+    SELF_INSERT_KEYS,
+)
 
 
 # (num_buffs, active_buff)
@@ -203,3 +209,16 @@ def test_find_buffer(ihmacs_state, name):
             found_buffer = i
             break
     assert found_buffer == ihmacs_state.find_buffer(name)
+
+
+# read_self_insert_keys
+def test_read_self_insert_keys():
+    """
+    Test that rebound printable keys are left out of the self insert keys.
+    """
+    keymap = dict(DEFAULT_GLOBAL_KEYMAP)
+    keymap["a"] = command_undefined
+    keymap["b"] = {"c": self_insert_command}
+
+    assert read_self_insert_keys(DEFAULT_GLOBAL_KEYMAP) == SELF_INSERT_KEYS
+    assert read_self_insert_keys(keymap) == SELF_INSERT_KEYS - {"a", "b"}
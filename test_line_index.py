@@ -0,0 +1,95 @@
+"""
+Unit tests for the LineIndex class.
+
+Each operation is checked against the newlines found in a plain string.
+"""
+
+
+#pylint: skip-file
+
+import pytest
+
+from line_index import LineIndex, find_newlines
+
+from test_buff import LOREM_IPSUM
+
+
+TEXT = "\n" + LOREM_IPSUM.replace(". ", ".\n") + "\n\n"
+
+positions = [0, 1, 2, 60, 61, 300, len(TEXT) - 1, len(TEXT)]
+
+
+def check(line_index, text):
+    """
+    Check every query of a line index against a string.
+    """
+    newlines = find_newlines(text)
+    assert len(line_index) == len(newlines)
+    assert [line_index.newline(i) for i in range(len(newlines))] == newlines
+    for pos in range(len(text) + 1):
+        assert line_index.count_before(pos) == text.count("\n", 0, pos)
+
+
+def test_find_newlines():
+    """
+    Test that every newline is found, with the offset added.
+    """
+    assert find_newlines("a\nb\n\n", 10) == [11, 13, 14]
+    assert find_newlines("no newlines") == []
+
+
+@pytest.mark.parametrize("text", ["", "\n", "no newlines", TEXT])
+def test_build(text):
+    """
+    Test that a new index finds the newlines of its text.
+    """
+    check(LineIndex(text), text)
+
+
+@pytest.mark.parametrize("gap", positions)
+@pytest.mark.parametrize("pos", positions)
+@pytest.mark.parametrize("insert_text", ["", "x", "\n", "New\nline\n"])
+def test_insert(gap, pos, insert_text):
+    """
+    Test inserting text at any position, wherever the gap was.
+    """
+    line_index = LineIndex(TEXT)
+    line_index.insert(gap, "")
+    line_index.insert(pos, insert_text)
+
+    check(line_index, TEXT[:pos] + insert_text + TEXT[pos:])
+
+
+@pytest.mark.parametrize("gap", positions)
+@pytest.mark.parametrize("start", positions)
+@pytest.mark.parametrize("length", [0, 1, 2, 50])
+def test_delete(gap, start, length):
+    """
+    Test deleting text from any position, wherever the gap was.
+    """
+    line_index = LineIndex(TEXT)
+    line_index.insert(gap, "")
+    end = min(start + length, len(TEXT))
+    line_index.delete(start, end)
+
+    check(line_index, TEXT[:start] + TEXT[end:])
+
+
+def test_typing_at_cursor():
+    """
+    Test a burst of typing and deleting at one place, then moving away.
+    """
+    line_index = LineIndex(TEXT)
+    text = TEXT
+    pos = 100
+    for char in "ab\ncd\n\ne":
+        line_index.insert(pos, char)
+        text = text[:pos] + char + text[pos:]
+        pos += 1
+    line_index.delete(pos - 4, pos)
+    text = text[:pos-4] + text[pos:]
+    check(line_index, text)
+
+    line_index.insert(3, "\n")
+    text = text[:3] + "\n" + text[3:]
+    check(line_index, text)
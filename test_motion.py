@@ -0,0 +1,219 @@
+"""
+Test motion scanning helper functions.
+"""
+
+
+import re
+import sys
+
+import pytest
+
+import motion
+from fundamental_mode import FundamentalMode
+
+
+WORD_DELIMITERS = re.compile(r"[\s\-_]+")
+NEWLINES = re.compile(r"\n+")
+
+TEXT = "one two-three\n\nfour_five  six"
+
+
+unit_end_after_cases = [
+    # (pos, delimiter_regex, num, expected)
+    (0, WORD_DELIMITERS, 1, 3),
+    (0, WORD_DELIMITERS, 2, 7),
+    (3, WORD_DELIMITERS, 1, 7),
+    (4, WORD_DELIMITERS, 3, 19),
+    (20, WORD_DELIMITERS, 1, 24),
+    (20, WORD_DELIMITERS, 2, None),
+    (0, NEWLINES, 1, 13),
+    (13, NEWLINES, 1, None),
+]
+
+
+@pytest.mark.parametrize("pos,delimiter_regex,num,expected",
+                         unit_end_after_cases)
+def test_unit_end_after(pos, delimiter_regex, num, expected):
+    """
+    Test that the end of the Nth unit after a position is found.
+    """
+    assert motion.unit_end_after(TEXT, pos, delimiter_regex, num) == expected
+
+
+unit_start_before_cases = [
+    # (pos, delimiter_regex, num, expected)
+    (len(TEXT), WORD_DELIMITERS, 1, 26),
+    (len(TEXT), WORD_DELIMITERS, 2, 20),
+    (26, WORD_DELIMITERS, 1, 20),
+    (8, WORD_DELIMITERS, 1, 4),
+    (8, WORD_DELIMITERS, 2, None),
+    (3, WORD_DELIMITERS, 1, None),
+    (len(TEXT), NEWLINES, 1, 15),
+    (15, NEWLINES, 1, None),
+]
+
+
+@pytest.mark.parametrize("pos,delimiter_regex,num,expected",
+                         unit_start_before_cases)
+def test_unit_start_before(pos, delimiter_regex, num, expected):
+    """
+    Test that the start of the Nth unit before a position is found.
+    """
+    assert (motion.unit_start_before(TEXT, pos, delimiter_regex, num)
+            == expected)
+
+
+# Word motion with a char table should match the regex based unit motion.
+WORD_CHAR_TABLE = FundamentalMode().word_char_table
+
+# Crosses several scanning chunks, and has unicode whitespace and a null
+# character that is not a delimiter.
+LONG_TEXT = ("a" * 5000 + " " * 5000 + "b　c\0d" + "-" * 9000 + "e_f") * 2
+
+word_texts = [TEXT, LONG_TEXT, "", "   ", "word"]
+
+
+@pytest.mark.parametrize("text", word_texts)
+@pytest.mark.parametrize("num", [1, 2, 3, 9])
+def test_word_end_after(text, num):
+    """
+    Test that word_end_after agrees with unit_end_after at every position.
+    """
+    def substring(start, end):
+        return text[start:end]
+
+    for pos in range(0, len(text) + 1, 1 + len(text) // 300):
+        assert (motion.word_end_after(substring, len(text), pos,
+                                      WORD_CHAR_TABLE, num)
+                == motion.unit_end_after(text, pos, WORD_DELIMITERS, num))
+
+
+@pytest.mark.parametrize("text", word_texts)
+@pytest.mark.parametrize("num", [1, 2, 3, 9])
+def test_word_start_before(text, num):
+    """
+    Test that word_start_before agrees with unit_start_before at every
+    position.
+    """
+    def substring(start, end):
+        return text[start:end]
+
+    for pos in range(0, len(text) + 1, 1 + len(text) // 300):
+        assert (motion.word_start_before(substring, pos, WORD_CHAR_TABLE, num)
+                == motion.unit_start_before(text, pos, WORD_DELIMITERS, num))
+
+
+def test_word_char_table_matches_regex():
+    """
+    Test that the word char table holds exactly the characters the word
+    delimiter regex matches.
+    """
+    delimiters = {code for code in range(sys.maxunicode + 1)
+                  if WORD_DELIMITERS.match(chr(code))}
+    assert delimiters == {code for code, char in WORD_CHAR_TABLE.items()
+                          if char == "\0"}
+
+
+# Line motion with a line index should match the regex based unit motion.
+line_texts = [TEXT, "", "\n", "\n\n", "a\n\nb\n", "\n\na\nbc\n\n\nd\n\n",
+              "one\ntwo\n\nthree"]
+
+
+def line_index(text):
+    """
+    Return a line_span function and the line count for a string.
+    """
+    newlines = [i for i, char in enumerate(text) if char == "\n"]
+    starts = [0] + [i + 1 for i in newlines]
+    ends = newlines + [len(text)]
+
+    def line_span(line):
+        return (starts[line-1], ends[line-1])
+
+    return line_span, len(starts)
+
+
+def line_at(text, pos):
+    """
+    Return the line a position is on.
+    """
+    return text.count("\n", 0, pos) + 1
+
+
+@pytest.mark.parametrize("text", line_texts)
+@pytest.mark.parametrize("num", [1, 2, 3, 9])
+def test_line_end_after(text, num):
+    """
+    Test that line_end_after agrees with unit_end_after at every position.
+    """
+    line_span, line_count = line_index(text)
+    for pos in range(len(text) + 1):
+        assert (motion.line_end_after(line_span, line_count,
+                                      line_at(text, pos), pos, num)
+                == motion.unit_end_after(text, pos, NEWLINES, num))
+
+
+@pytest.mark.parametrize("text", line_texts)
+@pytest.mark.parametrize("num", [1, 2, 3, 9])
+def test_line_start_before(text, num):
+    """
+    Test that line_start_before agrees with unit_start_before at every
+    position.
+    """
+    line_span, line_count = line_index(text)
+    for pos in range(len(text) + 1):
+        assert (motion.line_start_before(line_span, line_count,
+                                         line_at(text, pos), pos, num)
+                == motion.unit_start_before(text, pos, NEWLINES, num))
+
+
+def clamped(new_pos, num, text):
+    """
+    Return what a motion N units away gives for a search result.
+    """
+    if new_pos is not None:
+        return new_pos
+    return len(text) if num > 0 else 0
+
+
+@pytest.mark.parametrize("num", [-3, -1, 0, 1, 3])
+def test_units_away(num):
+    """
+    Test that units_away clamps the unit searches to the text.
+    """
+    for pos in range(len(TEXT) + 1):
+        if num > 0:
+            expected = motion.unit_end_after(TEXT, pos, NEWLINES, num)
+        elif num < 0:
+            expected = motion.unit_start_before(TEXT, pos, NEWLINES, -num)
+        else:
+            expected = pos
+        assert (motion.units_away(TEXT, pos, NEWLINES, num)
+                == clamped(expected, num, TEXT))
+
+
+@pytest.mark.parametrize("num", [-3, -1, 0, 1, 3])
+def test_words_away(num):
+    """
+    Test that words_away agrees with units_away at every position.
+    """
+    def substring(start, end):
+        return TEXT[start:end]
+
+    for pos in range(len(TEXT) + 1):
+        assert (motion.words_away(substring, len(TEXT), pos,
+                                  WORD_CHAR_TABLE, num)
+                == motion.units_away(TEXT, pos, WORD_DELIMITERS, num))
+
+
+@pytest.mark.parametrize("text", line_texts)
+@pytest.mark.parametrize("num", [-3, -1, 0, 1, 3])
+def test_lines_away(text, num):
+    """
+    Test that lines_away agrees with units_away at every position.
+    """
+    line_span, line_count = line_index(text)
+    for pos in range(len(text) + 1):
+        assert (motion.lines_away(line_span, line_count, line_at(text, pos),
+                                  pos, num)
+                == motion.units_away(text, pos, NEWLINES, num))
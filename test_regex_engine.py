@@ -0,0 +1,68 @@
+"""
+Test choosing the regex engine patterns are compiled with.
+"""
+
+
+#pylint: skip-file
+
+import re
+
+import pytest
+
+import regex_engine
+
+
+class FakeRe2:
+    """
+    Stand in for the re2 module that records the patterns compiled.
+    """
+
+    def __init__(self):
+        self.patterns = []
+
+    def compile(self, pattern):
+        self.patterns.append(pattern)
+        return re.compile(pattern)
+
+
+@pytest.fixture
+def fake_re2(monkeypatch):
+    """
+    Install a fake re2 module into regex_engine.
+    """
+    fake = FakeRe2()
+    monkeypatch.setattr(regex_engine, "re2", fake)
+    return fake
+
+
+def test_default_engine_is_re(fake_re2):
+    """
+    Test that patterns are compiled with re unless RE2 is turned on.
+    """
+    regex = regex_engine.compile_regex(r"[\s\-_]+")
+
+    assert isinstance(regex, re.Pattern)
+    assert regex.pattern == r"[\s\-_]+"
+    assert fake_re2.patterns == []
+
+
+def test_use_re2(fake_re2, monkeypatch):
+    """
+    Test that patterns are compiled with re2 when it is turned on.
+    """
+    monkeypatch.setattr(regex_engine, "USE_RE2", True)
+    regex = regex_engine.compile_regex(r"\n+")
+
+    assert fake_re2.patterns == [r"\n+"]
+    assert [m.span() for m in regex.finditer("a\n\nb\n", 2)] == [(2, 3),
+                                                                 (4, 5)]
+
+
+def test_use_re2_not_installed(monkeypatch):
+    """
+    Test that re is used when RE2 is turned on but is not installed.
+    """
+    monkeypatch.setattr(regex_engine, "USE_RE2", True)
+    monkeypatch.setattr(regex_engine, "re2", None)
+
+    assert isinstance(regex_engine.compile_regex("a"), re.Pattern)
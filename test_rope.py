@@ -0,0 +1,199 @@
+"""
+Unit tests for the Rope class.
+
+Each operation is checked against the equivalent operation on a plain string.
+"""
+
+
+#pylint: skip-file
+
+import pytest
+
+import rope
+from rope import Rope
+
+from test_buff import LOREM_IPSUM
+
+
+# Long enough to be stored in many leaves
+LONG_TEXT = LOREM_IPSUM * 40
+
+rope_texts = ["", "a", "Hello\nWorld", LOREM_IPSUM, LONG_TEXT]
+
+positions = [0, 1, 5, 63, 64, 445, 2047, 2048, 2049, 10000, len(LONG_TEXT)]
+
+
+def is_balanced(node):
+    """
+    Return whether every node in a subtree has a valid AVL height.
+    """
+    if isinstance(node, str):
+        return True
+    heights = (rope._height(node.left), rope._height(node.right))
+    return (abs(heights[0] - heights[1]) <= 1
+            and node.height == max(heights) + 1
+            and node.length == (rope._length(node.left)
+                                + rope._length(node.right))
+            and is_balanced(node.left)
+            and is_balanced(node.right))
+
+
+@pytest.mark.parametrize("text", rope_texts)
+def test_str(text):
+    """
+    Test that a rope flattens back into the text it was built from.
+    """
+    assert str(Rope(text)) == text
+
+
+@pytest.mark.parametrize("text", rope_texts)
+def test_len(text):
+    """
+    Test that the length of a rope is the length of its text.
+    """
+    assert len(Rope(text)) == len(text)
+
+
+@pytest.mark.parametrize("pos", positions)
+def test_index(pos):
+    """
+    Test that index returns the character at a position.
+    """
+    assert Rope(LONG_TEXT).index(pos % len(LONG_TEXT)) == \
+        LONG_TEXT[pos % len(LONG_TEXT)]
+
+
+def test_index_out_of_range():
+    """
+    Test that index raises an IndexError past the end of the rope.
+    """
+    with pytest.raises(IndexError):
+        Rope(LOREM_IPSUM).index(len(LOREM_IPSUM))
+
+
+@pytest.mark.parametrize("start", positions)
+@pytest.mark.parametrize("length", [0, 1, 100, 5000])
+def test_substring(start, length):
+    """
+    Test that substring matches slicing the text.
+    """
+    assert (Rope(LONG_TEXT).substring(start, start + length)
+            == LONG_TEXT[start:start + length])
+
+
+@pytest.mark.parametrize("pos", positions)
+@pytest.mark.parametrize("insert_text", ["", "x", "New\nline", LONG_TEXT])
+def test_insert(pos, insert_text):
+    """
+    Test inserting text into a rope.
+    """
+    text_rope = Rope(LONG_TEXT)
+    text_rope.insert(pos, insert_text)
+
+    assert str(text_rope) == LONG_TEXT[:pos] + insert_text + LONG_TEXT[pos:]
+    assert is_balanced(text_rope._root)
+
+
+@pytest.mark.parametrize("start", positions)
+@pytest.mark.parametrize("length", [0, 1, 100, 5000])
+def test_delete(start, length):
+    """
+    Test deleting text from a rope.
+    """
+    text_rope = Rope(LONG_TEXT)
+    text_rope.delete(start, start + length)
+
+    assert str(text_rope) == LONG_TEXT[:start] + LONG_TEXT[start + length:]
+    assert is_balanced(text_rope._root)
+
+
+@pytest.mark.parametrize("pos", positions)
+def test_split(pos):
+    """
+    Test that splitting a rope leaves the original rope intact.
+    """
+    text_rope = Rope(LONG_TEXT)
+    left, right = text_rope.split(pos)
+
+    assert str(left) == LONG_TEXT[:pos]
+    assert str(right) == LONG_TEXT[pos:]
+    assert str(text_rope) == LONG_TEXT
+
+
+def test_many_edits_stay_balanced():
+    """
+    Test that typing a character at a time keeps the tree balanced.
+    """
+    text_rope = Rope()
+    text = ""
+    for i in range(5000):
+        pos = (i * 7) % (len(text) + 1)
+        text_rope.insert(pos, "ab\n"[i % 3])
+        text = text[:pos] + "ab\n"[i % 3] + text[pos:]
+
+    assert str(text_rope) == text
+    assert is_balanced(text_rope._root)
+
+
+@pytest.mark.parametrize("pos", positions)
+def test_typing_at_cursor(pos):
+    """
+    Test a burst of inserts and deletes at the same location.
+
+    These edits all go through the gap buffer, so reads are checked in
+    between edits.
+    """
+    text_rope = Rope(LONG_TEXT)
+    text = LONG_TEXT
+    for char in "Hello\nWorld":
+        text_rope.insert(pos, char)
+        text = text[:pos] + char + text[pos:]
+        pos += 1
+        start = max(0, pos - 5)
+        assert text_rope.substring(start, pos + 5) == text[start:pos+5]
+
+    # Backspace twice, then delete forwards once
+    text_rope.delete(pos - 2, pos)
+    text_rope.delete(pos - 2, pos - 1)
+    text = text[:pos-2] + text[pos:]
+    text = text[:pos-2] + text[pos-1:]
+
+    assert str(text_rope) == text
+    assert len(text_rope) == len(text)
+    assert text_rope.index(pos - 3) == text[pos-3]
+
+
+def test_edit_outside_gap():
+    """
+    Test that editing far away from the last edit keeps both edits.
+    """
+    text_rope = Rope(LONG_TEXT)
+    text_rope.insert(10, "first")
+    text_rope.insert(10000, "second")
+    text_rope.delete(0, 3)
+
+    text = LONG_TEXT[:10] + "first" + LONG_TEXT[10:]
+    text = text[:10000] + "second" + text[10000:]
+    text = text[3:]
+
+    assert str(text_rope) == text
+    assert is_balanced(text_rope._root)
+
+
+def test_snapshot():
+    """
+    Test that a snapshot keeps its text while the rope goes on being edited.
+    """
+    text_rope = Rope(LONG_TEXT)
+    text_rope.insert(5000, "typed")
+    snapshot = text_rope.snapshot()
+
+    text_rope.insert(5005, " more")
+    text_rope.delete(0, 3000)
+    snapshot.insert(0, "other")
+
+    assert str(snapshot) == ("other" + LONG_TEXT[:5000] + "typed"
+                             + LONG_TEXT[5000:])
+    assert str(text_rope) == (LONG_TEXT[3000:5000] + "typed more"
+                              + LONG_TEXT[5000:])
+    assert is_balanced(snapshot._root)
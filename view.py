@@ -55,7 +55,6 @@ class View:
         # Line numbers index at 1, but Python indexes at 0.
         point_line = buff.line - 1
         point_col = buff.column
-        text = buff.text
         # Line numbers index at 1, but Python indexes at 0.
         start_line = buff.display_line - 1
 
@@ -65,8 +64,13 @@ class View:
         # Editing area is all but the last 2 lines
         display_lines = term_lines - 2
 
-        # Draw text
-        display_text = text.split("\n")[start_line:start_line+display_lines]
+        # Draw text, reading only the lines that fit on screen
+        display_text = []
+        if start_line < buff.line_count:
+            last_line = min(buff.line_count, start_line + display_lines)
+            text_start = buff.line_span(start_line + 1)[0]
+            text_end = buff.line_span(last_line)[1]
+            display_text = buff.substring(text_start, text_end).split("\n")
         for line, text in enumerate(display_text):
             text = display_text[line]
             if len(text) > term_cols:
@@ -127,11 +131,12 @@ class View:
         """
         Print the echo string in the echo area.
 
-        Args:
-            text: A string representing text to print in the echo area.
+        If the echo string is a function, call it to get the string to print.
         """
         ihmacs_state = self.ihmacs_state
         text = ihmacs_state.echo
+        if callable(text):
+            text = text()
 
         window = ihmacs_state.window
 